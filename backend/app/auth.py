@@ -1,17 +1,20 @@
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Optional
 
 from fastapi import HTTPException, Depends, Request, APIRouter
 from fastapi.responses import RedirectResponse
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
 from urllib.parse import urlencode
-from app import models, schemas
-from app.database import get_db
-import httpx
+from app import models, schemas, hashing, google
+from app.database import AsyncSessionLocal, get_async_db, get_async_read_db, is_replica
 import os
+import time
 
 router = APIRouter()
 
@@ -20,20 +23,43 @@ SECRET_KEY = "super-secret-key"  # Use env in prod
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
+# Principals are cached per process; the TTL bounds how long another worker
+# can keep serving a principal after a role change it did not see.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = hashing.pwd_context
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
 
 
 # --- Auth Helpers ---
+# Blocking: for offline scripts such as bench/seed.py. Request handlers
+# go through hashing.verify_and_update, which runs on the hash pool.
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+async def authenticate(db: AsyncSession, email: str, password: str) -> models.User:
+    """Check credentials without blocking the event loop on bcrypt.
+
+    The hash runs on the bounded pool in app.hashing (503 when saturated);
+    hashes made with an outdated cost factor are replaced transparently.
+    """
+    user = await db.scalar(select(models.User).where(models.User.email == email))
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    valid, new_hash = await hashing.verify_and_update(password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+    return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -41,6 +67,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def token_claims(user: models.User) -> dict:
+    # role is for the frontend, which decodes it to pick the UI; the server
+    # authorizes from the loaded principal and checks only ver.
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role.value if hasattr(user.role, "value") else user.role,
+        "ver": user.token_version or 0,
+    }
+
 def decode_token(token: str) -> dict:
     try:
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -48,32 +84,124 @@ def decode_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+# --- Principal Cache ---
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller; a detached snapshot of the fields routes need."""
+    id: int
+    email: str
+    role: models.UserRole
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=models.UserRole(user.role),
+                   token_version=user.token_version or 0)
+
+
+class PrincipalCache:
+    """Bounded LRU of principals by user id, with a per-entry TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(models.User, "before_update")
+def _bump_token_version(mapper, connection, target):
+    if inspect(target).attrs.role.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
+
+
 # --- User Retrieval ---
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+async def _load_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    user = await db.get(models.User, user_id)
+    return Principal.from_user(user) if user is not None else None
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme),
+                           db: AsyncSession = Depends(get_async_read_db)) -> Principal:
     payload = decode_token(token)
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid token")
-
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if user is None:
-        raise HTTPException(status_code=401, detail="User not found")
-
-    return user
+    user_id = int(user_id)
+    version = payload.get("ver")
+
+    principal = principal_cache.get(user_id)
+    if principal is not None and (version or 0) > principal.token_version:
+        # The user changed in another process after this entry was cached;
+        # reload it rather than reject the newer token.
+        principal_cache.invalidate(user_id)
+        principal = None
+    if principal is None:
+        principal = await _load_principal(db, user_id)
+        # A replica may not have replayed a just-created user or a role change
+        # yet (the token is newer than what it sees); the primary has both.
+        if is_replica(db) and (principal is None or (version or 0) > principal.token_version):
+            async with AsyncSessionLocal() as primary:
+                principal = await _load_principal(primary, user_id)
+        if principal is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal_cache.put(principal)
+
+    # Tokens minted before a role change carry a stale version.
+    if version is not None and version < principal.token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    return principal
 
 
 # --- Role Checks ---
-def require_admin(user: models.User = Depends(get_current_user)):
+async def require_admin(user: Principal = Depends(get_current_user)):
     if user.role != "ADMIN":
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
 
-def require_maintainer(user: models.User = Depends(get_current_user)):
+async def require_maintainer(user: Principal = Depends(get_current_user)):
     if user.role not in ("ADMIN", "MAINTAINER"):
         raise HTTPException(status_code=403, detail="Maintainer access required")
     return user
 
-def require_reporter(user: models.User = Depends(get_current_user)):
+async def require_reporter(user: Principal = Depends(get_current_user)):
     if user.role not in ("ADMIN", "REPORTER"):
         raise HTTPException(status_code=403, detail="Reporter access required")
     return user
@@ -94,60 +222,61 @@ def google_login():
 
 
 @router.get("/auth/google/callback")
-async def google_callback(request: Request, db: Session = Depends(get_db)):
+async def google_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     code = request.query_params.get("code")
     if not code:
         raise HTTPException(status_code=400, detail="Missing code in callback")
 
-    async with httpx.AsyncClient() as client:
-        # Step 1: Exchange code for token
-        token_res = await client.post("https://oauth2.googleapis.com/token", data={
-            "code": code,
-            "client_id": GOOGLE_CLIENT_ID,
-            "client_secret": GOOGLE_CLIENT_SECRET,
-            "redirect_uri": GOOGLE_REDIRECT_URI,
-            "grant_type": "authorization_code"
-        })
+    client = google.get_http_client()
 
-        if token_res.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch token from Google")
+    # Step 1: Exchange code for token
+    token_res = await client.post("https://oauth2.googleapis.com/token", data={
+        "code": code,
+        "client_id": GOOGLE_CLIENT_ID,
+        "client_secret": GOOGLE_CLIENT_SECRET,
+        "redirect_uri": GOOGLE_REDIRECT_URI,
+        "grant_type": "authorization_code"
+    })
 
-        token_data = token_res.json()
-        access_token = token_data["access_token"]
+    if token_res.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to fetch token from Google")
 
-        # Step 2: Get user info
-        user_res = await client.get("https://www.googleapis.com/oauth2/v2/userinfo", headers={
-            "Authorization": f"Bearer {access_token}"
-        })
+    token_data = token_res.json()
 
-        if user_res.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch user info from Google")
+    # Step 2: Verify the ID token locally instead of calling userinfo
+    claims = await google.verify_id_token(token_data["id_token"], token_data.get("access_token"))
 
-        user_data = user_res.json()
-        email = user_data["email"]
+    # Step 3: Check if user exists in DB, else create
+    user = await get_or_create_oauth_user(db, claims["email"])
 
-        # Step 3: Check if user exists in DB, else create
-        user = db.query(models.User).filter(models.User.email == email).first()
-        if not user:
-            user = models.User(email=email, hashed_password="GOOGLE_OAUTH", role="REPORTER")
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+    # ✅ INCLUDE EMAIL IN JWT
+    token = create_access_token(token_claims(user))
+    return {"access_token": token, "token_type": "bearer"}
 
-        # ✅ INCLUDE EMAIL IN JWT
-        token = create_access_token({"sub": str(user.id), "email": user.email})
-        return {"access_token": token, "token_type": "bearer"}
+
+async def get_or_create_oauth_user(db: AsyncSession, email: str) -> models.User:
+    user = await db.scalar(select(models.User).where(models.User.email == email))
+    if not user:
+        user = models.User(email=email, hashed_password="GOOGLE_OAUTH", role="REPORTER")
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+    return user
 
 
 # --- Email/Password Login Route ---
 from fastapi.security import OAuth2PasswordRequestForm
 
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate(db, form_data.username, form_data.password)
 
     # ✅ INCLUDE EMAIL IN JWT
-    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+    access_token = create_access_token(data=token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+# --- Hash Pool Metrics (ADMIN only) ---
+@router.get("/auth/hash-stats")
+def hash_stats(user: Principal = Depends(require_admin)):
+    return hashing.metrics.snapshot()
@@ -0,0 +1,183 @@
+import json
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import models, schemas, counters, history
+from app.database import dialect_insert
+
+# Records validated and inserted per transaction.
+BULK_BATCH_SIZE = 5000
+# Per-record errors echoed back in the summary; the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+
+# --- Request parsing ---
+async def read_batches(request: Request) -> AsyncIterator[list]:
+    """Yield lists of (index, record-or-error) from a JSON array or NDJSON body.
+
+    NDJSON is consumed incrementally, so only one batch of parsed records
+    is held in memory at a time.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        batch, index, buffer = [], 0, b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    batch.append((index, _parse_line(line)))
+                    index += 1
+                    if len(batch) >= BULK_BATCH_SIZE:
+                        yield batch
+                        batch = []
+        if buffer.strip():
+            batch.append((index, _parse_line(buffer)))
+        if batch:
+            yield batch
+        return
+
+    try:
+        records = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    for start in range(0, len(records), BULK_BATCH_SIZE):
+        yield list(enumerate(records[start:start + BULK_BATCH_SIZE], start))
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return ValueError(f"invalid JSON: {exc}")
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors())
+
+
+# --- Ingestion ---
+class BulkImporter:
+    """Validates and inserts issue records batch by batch, one transaction per batch."""
+
+    def __init__(self, default_reporter_id: int):
+        self.default_reporter_id = default_reporter_id
+        self.received = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def _fail(self, index: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "error": message})
+
+    def _validate(self, batch: list) -> list[tuple[int, dict]]:
+        rows = []
+        for index, record in batch:
+            if isinstance(record, Exception):
+                self._fail(index, str(record))
+                continue
+            if not isinstance(record, dict):
+                self._fail(index, "record must be a JSON object")
+                continue
+            try:
+                issue = schemas.IssueImport(**record)
+            except ValidationError as exc:
+                self._fail(index, _describe(exc))
+                continue
+            rows.append((index, {
+                "title": issue.title,
+                "description": issue.description,
+                "severity": models.Severity(issue.severity.value),
+                "status": models.Status(issue.status.value),
+                "reporter_id": issue.reporter_id or self.default_reporter_id,
+                "created_at": models.naive_utc(issue.created_at),
+                "idempotency_key": issue.idempotency_key,
+            }))
+        return rows
+
+    def _drop_unknown_reporters(self, db: Session, rows: list) -> list:
+        reporter_ids = {row["reporter_id"] for _, row in rows}
+        known = {
+            user_id for (user_id,) in
+            db.query(models.User.id).filter(models.User.id.in_(reporter_ids))
+        }
+        valid = []
+        for index, row in rows:
+            if row["reporter_id"] in known:
+                valid.append((index, row))
+            else:
+                self._fail(index, f"reporter_id {row['reporter_id']} does not exist")
+        return valid
+
+    def _drop_repeated_keys(self, rows: list) -> list:
+        # Two records sharing a key inside one request: keep the first.
+        seen, unique = set(), []
+        for index, row in rows:
+            key = row["idempotency_key"]
+            if key is not None and key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            unique.append((index, row))
+        return unique
+
+    def ingest(self, db: Session, batch: list):
+        self.received += len(batch)
+        rows = self._drop_repeated_keys(self._drop_unknown_reporters(db, self._validate(batch)))
+        if not rows:
+            return
+
+        now = datetime.utcnow()
+        values = [{**row, "created_at": row["created_at"] or now, "updated_at": now} for _, row in rows]
+
+        table = models.Issue.__table__
+        keys = models.IssueImportKey.__table__
+        insert = dialect_insert(db)
+        # executemany with RETURNING is sent as multi-row INSERT ... VALUES
+        # pages. Keys are claimed first; records whose key was already
+        # claimed are skipped, not errors.
+        claim = insert(keys).on_conflict_do_nothing(index_elements=[keys.c.key]).returning(keys.c.key)
+        stmt = insert(table).returning(table.c.id, table.c.severity, table.c.status, table.c.created_at)
+        try:
+            requested = [{"key": row["idempotency_key"]} for row in values if row["idempotency_key"] is not None]
+            if requested:
+                claimed = set(db.execute(claim, requested).scalars())
+                values = [row for row in values if row["idempotency_key"] is None or row["idempotency_key"] in claimed]
+            inserted = db.execute(stmt, values).all() if values else []
+        except SQLAlchemyError as exc:
+            db.rollback()
+            for index, _ in rows:
+                self._fail(index, f"batch insert failed: {exc.__class__.__name__}")
+            return
+
+        buckets = Counter((severity, status) for _, severity, status, _ in inserted)
+        for (severity, status), count in buckets.items():
+            counters.bump(db, severity, status, count)
+        history.record(db, (
+            history.transition(issue_id, severity, None, status, at=created_at)
+            for issue_id, severity, status, created_at in inserted
+        ))
+        db.commit()
+
+        self.inserted += len(inserted)
+        self.duplicates += len(rows) - len(inserted)
+
+    def summary(self) -> dict:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
@@ -0,0 +1,138 @@
+import hashlib
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import dialect_insert
+
+ISSUES = "issues"
+
+# Rendered bodies kept per process; entries for superseded versions simply
+# age out of the LRU.
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+_CHANGED_KEY = "changed_collections"
+_BUMPED_KEY = "bumped_collections"
+
+
+# --- Versions ---
+def mark_changed(db: Session, collection: str = ISSUES):
+    """Bump ``collection``'s version when ``db`` commits (once per transaction)."""
+    db.info.setdefault(_CHANGED_KEY, set()).add(collection)
+
+
+def bump_versions(session: Session) -> dict:
+    """Apply the transaction's pending bumps now; returns {collection: version it commits as}.
+
+    Runs from before_commit. Repeat calls in the same transaction are no-ops,
+    so other before_commit hooks can call it to learn their version.
+    """
+    bumped = session.info.setdefault(_BUMPED_KEY, {})
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if not changed:
+        return bumped
+    table = models.CollectionVersion.__table__
+    insert = dialect_insert(session)
+    for name in sorted(changed):
+        stmt = insert(table).values(name=name, version=1).on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={"version": table.c.version + 1},
+        )
+        bumped[name] = session.execute(stmt.returning(table.c.version)).scalar_one()
+    return bumped
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session):
+    bump_versions(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop(_CHANGED_KEY, None)
+    session.info.pop(_BUMPED_KEY, None)
+
+
+def current_version(db: Session, collection: str = ISSUES) -> int:
+    version = (
+        db.query(models.CollectionVersion.version)
+        .filter(models.CollectionVersion.name == collection)
+        .scalar()
+    )
+    return version or 0
+
+
+# --- Rendered response cache ---
+class ResponseCache:
+    """Small LRU of rendered (body, headers) keyed by request identity and version."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key) -> Optional[tuple[bytes, dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry: tuple[bytes, dict]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in tags or "*" in tags
+
+
+async def conditional_json(request: Request, db: AsyncSession, scope: str,
+                           render: Callable[[], Awaitable[tuple[bytes, dict]]],
+                           collection: str = ISSUES) -> Response:
+    """Serve a read endpoint from its collection version.
+
+    ``scope`` names whose view this is (e.g. "all" or "user:7"). A matching
+    If-None-Match gets a 304 and a cached render is reused; ``render`` (which
+    returns body bytes and extra headers) only runs on a miss.
+    """
+    # Read the version before any data: a write landing in between can only
+    # make the cached body newer than its version, never older.
+    version = await db.run_sync(current_version, collection)
+    identity = (request.url.path, scope, str(request.query_params))
+    digest = hashlib.sha1(repr((identity, version)).encode()).hexdigest()[:20]
+    etag = f'"{version}-{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (identity, version)
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = await render()
+        response_cache.put(key, entry)
+    body, extra_headers = entry
+    return Response(content=body, media_type="application/json", headers={**headers, **extra_headers})
@@ -0,0 +1,147 @@
+import sys
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app import models, realtime, caching
+from app.database import dialect_insert
+
+
+# --- Incremental maintenance ---
+def bump(db: Session, severity, status, delta: int):
+    """Add ``delta`` to one (severity, status) bucket inside the caller's transaction."""
+    if not delta:
+        return
+    counter = models.IssueCounter.__table__
+    insert = dialect_insert(db)
+    stmt = insert(counter).values(severity=severity, status=status, count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counter.c.severity, counter.c.status],
+        set_={"count": counter.c.count + delta},
+    )
+    db.execute(stmt)
+    realtime.record_delta(db, severity, status, delta)
+    caching.mark_changed(db, caching.ISSUES)
+
+
+def record_create(db: Session, issue: models.Issue):
+    bump(db, issue.severity, issue.status, 1)
+
+
+def record_status_change(db: Session, severity, old_status, new_status):
+    if old_status == new_status:
+        return
+    # Touch buckets in a fixed order so two concurrent transitions in
+    # opposite directions cannot deadlock on each other's row locks.
+    for status, delta in sorted([(old_status, -1), (new_status, 1)], key=lambda item: item[0].value):
+        bump(db, severity, status, delta)
+
+
+def record_delete(db: Session, issue: models.Issue):
+    bump(db, issue.severity, issue.status, -1)
+
+
+# --- Reads ---
+def severity_counts(db: Session, statuses) -> list[dict]:
+    """Per-severity totals over ``statuses``; reads at most one row per bucket."""
+    counter = models.IssueCounter
+    results = (
+        db.query(counter.severity, func.sum(counter.count))
+        .filter(counter.status.in_(list(statuses)))
+        .group_by(counter.severity)
+        .having(func.sum(counter.count) > 0)
+        .order_by(counter.severity)
+        .all()
+    )
+    return [{"severity": severity, "count": int(count)} for severity, count in results]
+
+
+def snapshot(db: Session) -> tuple[int, list[dict]]:
+    """(issues version, every non-empty bucket): the state live-insight deltas are applied to.
+
+    One statement, so the buckets are exactly those of that version: deltas
+    tagged with it or older are already included.
+    """
+    counter = models.IssueCounter.__table__
+    versions = models.CollectionVersion.__table__
+    version = (
+        select(func.coalesce(func.max(versions.c.version), 0).label("version"))
+        .where(versions.c.name == caching.ISSUES)
+        .subquery()
+    )
+    rows = db.execute(
+        select(version.c.version, counter.c.severity, counter.c.status, counter.c.count)
+        .select_from(version.outerjoin(counter, counter.c.count != 0))
+    ).all()
+    buckets = [
+        {"severity": severity, "status": status, "count": count}
+        for _, severity, status, count in rows
+        if severity is not None
+    ]
+    return rows[0].version, buckets
+
+
+# --- Rebuild / verify ---
+def _scan_counts(db: Session) -> dict:
+    issue = models.Issue
+    rows = (
+        db.query(issue.severity, issue.status, func.count(issue.id))
+        .filter(issue.severity.isnot(None), issue.status.isnot(None))
+        .group_by(issue.severity, issue.status)
+        .all()
+    )
+    return {(severity, status): count for severity, status, count in rows}
+
+
+def _stored_counts(db: Session) -> dict:
+    counter = models.IssueCounter
+    rows = db.query(counter.severity, counter.status, counter.count).all()
+    return {(severity, status): count for severity, status, count in rows}
+
+
+def verify(db: Session) -> dict:
+    """Return {(severity, status): (stored, actual)} for every bucket that drifted."""
+    actual = _scan_counts(db)
+    stored = _stored_counts(db)
+    drift = {}
+    for key in set(actual) | set(stored):
+        if stored.get(key, 0) != actual.get(key, 0):
+            drift[key] = (stored.get(key, 0), actual.get(key, 0))
+    return drift
+
+
+def rebuild(db: Session) -> dict:
+    """Recompute every bucket from the issues table and return the drift that was fixed.
+
+    On PostgreSQL the issues table is locked against writes (reads still
+    proceed) so no issue write can land between the scan and the rewrite.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE issues IN SHARE MODE"))
+    drift = verify(db)
+    db.query(models.IssueCounter).delete()
+    for (severity, status), count in _scan_counts(db).items():
+        db.add(models.IssueCounter(severity=severity, status=status, count=count))
+    # Cached insight responses and their ETags may hold the drifted counts.
+    caching.mark_changed(db, caching.ISSUES)
+    db.commit()
+    return drift
+
+
+if __name__ == "__main__":
+    # python -m app.counters [verify|rebuild]
+    from app.database import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    with SessionLocal() as db:
+        drift = rebuild(db) if command == "rebuild" else verify(db)
+
+    for (severity, status), (stored, actual) in sorted(drift.items(), key=str):
+        print(f"{severity.value:<8} {status.value:<12} stored={stored} actual={actual}")
+    if command == "rebuild":
+        print(f"✅ Counters rebuilt ({len(drift)} bucket(s) corrected).")
+    elif drift:
+        print(f"❌ {len(drift)} bucket(s) drifted; run `python -m app.counters rebuild`.")
+        sys.exit(1)
+    else:
+        print("✅ Counters match the issues table.")
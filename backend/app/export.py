@@ -0,0 +1,88 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from app import models, serialization
+from app.database import SessionLocal
+
+# Rows fetched per round-trip from the server-side cursor. Each batch is
+# encoded and flushed to the client as one chunk, so memory stays bounded
+# by this number regardless of table size.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "severity",
+    "status",
+    "reporter_id",
+    "created_at",
+    "updated_at",
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _export_statement(status=None, severity=None, reporter_id: Optional[int] = None,
+                      updated_since: Optional[datetime] = None):
+    issue = models.Issue
+    stmt = select(*(getattr(issue, name) for name in EXPORT_COLUMNS))
+    if status is not None:
+        stmt = stmt.where(issue.status == status)
+    if severity is not None:
+        stmt = stmt.where(issue.severity == severity)
+    if reporter_id is not None:
+        stmt = stmt.where(issue.reporter_id == reporter_id)
+    if updated_since is not None:
+        stmt = stmt.where(issue.updated_at >= models.naive_utc(updated_since))
+    # Ordering on the watermark column means a consumer can resume from the
+    # last updated_at it saw.
+    return stmt.order_by(issue.updated_at, issue.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def _stream_batches(**filters) -> Iterator[list]:
+    # A request-scoped session (get_async_read_db) may be closed before a
+    # streaming body is drained, so the export owns its session for the whole stream.
+    with SessionLocal() as db:
+        result = db.execute(_export_statement(**filters))
+        for batch in result.partitions():
+            yield [[_plain(value) for value in row] for row in batch]
+
+
+def iter_ndjson(**filters) -> Iterator[bytes]:
+    for batch in _stream_batches(**filters):
+        yield b"".join(serialization.dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in batch)
+
+
+def iter_csv(**filters) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode()
+
+    for batch in _stream_batches(**filters):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+EXPORTERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import re
+import time
+from typing import Optional, Protocol
+
+import httpx
+from fastapi import HTTPException
+from jose import jwt, JWTError
+
+# --- Config ---
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Used when Google's response carries no usable Cache-Control max-age.
+DEFAULT_KEYS_TTL_SECONDS = 3600
+# An unknown kid forces a refetch at most this often, so forged headers
+# cannot turn every login into an outbound request.
+MIN_REFRESH_INTERVAL_SECONDS = 60
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+# --- Shared HTTP client ---
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """One connection-pooled client for all outbound Google calls."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def aclose():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# --- Signing key sources ---
+class KeySource(Protocol):
+    async def get_key(self, kid: str) -> Optional[dict]:
+        ...
+
+
+class GoogleJWKSource:
+    """Google's JWKS, cached for as long as its Cache-Control header allows."""
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL):
+        self.url = url
+        self._keys: dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str) -> Optional[dict]:
+        now = time.monotonic()
+        if now >= self._expires_at or (
+            kid not in self._keys and now - self._fetched_at >= MIN_REFRESH_INTERVAL_SECONDS
+        ):
+            await self._refresh()
+        return self._keys.get(kid)
+
+    async def _refresh(self):
+        # Concurrent logins that all miss share one fetch.
+        fetched_at = self._fetched_at
+        async with self._lock:
+            if self._fetched_at != fetched_at:
+                return
+            res = await get_http_client().get(self.url)
+            res.raise_for_status()
+            match = _MAX_AGE.search(res.headers.get("cache-control", ""))
+            ttl = int(match.group(1)) if match else DEFAULT_KEYS_TTL_SECONDS
+
+            self._keys = {key["kid"]: key for key in res.json()["keys"]}
+            self._fetched_at = time.monotonic()
+            self._expires_at = self._fetched_at + ttl
+
+
+class StaticKeySource:
+    """Fixed keys by kid; a local stand-in for Google in tests and offline runs."""
+
+    def __init__(self, keys: dict[str, dict]):
+        self.keys = keys
+
+    async def get_key(self, kid: str) -> Optional[dict]:
+        return self.keys.get(kid)
+
+
+key_source: KeySource = GoogleJWKSource()
+
+
+def set_key_source(source: KeySource):
+    global key_source
+    key_source = source
+
+
+# --- ID token verification ---
+async def verify_id_token(token: str, access_token: Optional[str] = None) -> dict:
+    """Verify a Google ID token's signature and claims locally and return the claims."""
+    if not GOOGLE_CLIENT_ID:
+        raise HTTPException(status_code=500, detail="Google login is not configured")
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid Google token")
+
+    try:
+        key = await key_source.get_key(kid) if kid else None
+    except httpx.HTTPError:
+        raise HTTPException(status_code=503, detail="Could not fetch Google signing keys")
+    if key is None:
+        raise HTTPException(status_code=401, detail="Invalid Google token")
+
+    try:
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[key.get("alg", "RS256")],
+            audience=GOOGLE_CLIENT_ID,
+            access_token=access_token,
+            options={"verify_at_hash": access_token is not None},
+        )
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid Google token")
+
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise HTTPException(status_code=401, detail="Invalid Google token")
+    if not claims.get("email"):
+        raise HTTPException(status_code=400, detail="Email not found in Google token")
+    if claims.get("email_verified") is False:
+        raise HTTPException(status_code=401, detail="Google email is not verified")
+    return claims
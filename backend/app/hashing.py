@@ -0,0 +1,132 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+# --- Config ---
+# bcrypt releases the GIL, so a sized thread pool gives real parallelism
+# without the pickling overhead of a process pool.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 2)))
+# Hash jobs allowed to wait behind the running ones before /login sheds load.
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(HASH_WORKERS * 4)))
+HASH_RETRY_AFTER_SECONDS = 1
+
+# Pinning min/max to the default flags any hash made with a different cost
+# factor as needing an update, which verify_and_update then rehashes.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+# --- Metrics ---
+class HashMetrics:
+    """Running totals used to size HASH_WORKERS and HASH_QUEUE_LIMIT."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def observe(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": HASH_WORKERS,
+                "queue_limit": HASH_QUEUE_LIMIT,
+                "in_flight": _in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "queue_wait_avg_ms": 1000 * self.queue_wait_total / completed,
+                "queue_wait_max_ms": 1000 * self.queue_wait_max,
+                "hash_time_avg_ms": 1000 * self.hash_time_total / completed,
+                "hash_time_max_ms": 1000 * self.hash_time_max,
+            }
+
+
+metrics = HashMetrics()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_in_flight = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="hash")
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# --- Pool submission ---
+async def _run(fn, *args):
+    """Run ``fn`` on the hash pool, or fail fast with 503 when it is saturated."""
+    global _in_flight
+    # Only touched from the event loop, so no lock is needed.
+    if _in_flight >= HASH_WORKERS + HASH_QUEUE_LIMIT:
+        metrics.rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication is busy, retry shortly",
+            headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+        )
+
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe(started - submitted, time.perf_counter() - started)
+
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), timed)
+    finally:
+        _in_flight -= 1
+
+
+def _verify_and_update(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    try:
+        return pwd_context.verify_and_update(plain, hashed)
+    except ValueError:
+        # Accounts created through Google carry a placeholder, not a hash.
+        return False, None
+
+
+async def verify_and_update(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """Verify off the event loop; returns (valid, replacement hash if the cost changed)."""
+    valid, new_hash = await _run(_verify_and_update, plain, hashed)
+    if new_hash is not None:
+        metrics.rehashed += 1
+    return valid, new_hash
@@ -0,0 +1,252 @@
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app import caching, models
+from app.database import dialect_insert
+
+DONE = models.Status.DONE
+
+GRANULARITIES = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+ROLLUP_FIELDS = ("opened", "resolved", "reopened", "removed", "resolution_count", "resolution_seconds")
+
+REBUILD_BATCH_SIZE = 10000
+
+
+def truncate(at: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# --- Transitions ---
+def transition(issue_id: int, severity, from_status, to_status, created_at: Optional[datetime] = None,
+               at: Optional[datetime] = None) -> dict:
+    """One issue_transitions row; ``created_at`` is needed to time resolutions."""
+    at = at or datetime.utcnow()
+    from_status = models.Status(from_status) if from_status is not None else None
+    to_status = models.Status(to_status) if to_status is not None else None
+    resolution_seconds = None
+    if to_status == DONE and from_status not in (None, DONE) and created_at is not None:
+        resolution_seconds = max((at - created_at).total_seconds(), 0.0)
+    return {
+        "issue_id": issue_id,
+        "severity": models.Severity(severity),
+        "from_status": from_status,
+        "to_status": to_status,
+        "at": at,
+        "resolution_seconds": resolution_seconds,
+    }
+
+
+def _rollup_deltas(row: dict) -> Optional[tuple]:
+    """The rollup counters one transition moves, or None if it moves none."""
+    from_status, to_status = row["from_status"], row["to_status"]
+    opened = resolved = reopened = removed = 0
+    if from_status is None:
+        opened = 1
+        # Imported already closed: opened and resolved in the same instant.
+        resolved = int(to_status == DONE)
+    elif to_status is None:
+        removed = int(from_status != DONE)
+    elif to_status == DONE and from_status != DONE:
+        resolved = 1
+    elif from_status == DONE and to_status != DONE:
+        reopened = 1
+    timed = row["resolution_seconds"] is not None
+    deltas = (opened, resolved, reopened, removed, int(timed), row["resolution_seconds"] if timed else 0.0)
+    return deltas if any(deltas) else None
+
+
+def _accumulate(totals: dict, row: dict):
+    deltas = _rollup_deltas(row)
+    if deltas is None:
+        return
+    for granularity in GRANULARITIES:
+        key = (granularity, truncate(row["at"], granularity), row["severity"])
+        totals[key] = [total + delta for total, delta in zip(totals[key], deltas)]
+
+
+def record(db: Session, rows: Iterable[dict]):
+    """Append ``rows`` (built with ``transition``) and fold them into the rollups, in the caller's transaction."""
+    rows = list(rows)
+    if not rows:
+        return
+    db.execute(insert(models.IssueTransition.__table__), rows)
+
+    totals = defaultdict(lambda: [0] * len(ROLLUP_FIELDS))
+    for row in rows:
+        _accumulate(totals, row)
+    if not totals:
+        return
+
+    rollup = models.IssueRollup.__table__
+    stmt = dialect_insert(db)(rollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[rollup.c.granularity, rollup.c.bucket, rollup.c.severity],
+        set_={field: rollup.c[field] + stmt.excluded[field] for field in ROLLUP_FIELDS},
+    )
+    # One executemany for every touched bucket (an import spanning years
+    # touches thousands), in a fixed key order so concurrent writers lock
+    # rollup rows in the same order.
+    db.execute(stmt, [
+        {"granularity": granularity, "bucket": bucket, "severity": severity, **dict(zip(ROLLUP_FIELDS, deltas))}
+        for (granularity, bucket, severity), deltas in sorted(totals.items(), key=lambda item: (*item[0][:2], item[0][2].value))
+    ])
+
+
+def record_create(db: Session, issue: models.Issue):
+    record(db, [transition(issue.id, issue.severity, None, issue.status, at=issue.created_at)])
+
+
+def record_status_change(db: Session, issue: models.Issue, old_status, new_status):
+    if old_status == new_status:
+        return
+    record(db, [transition(issue.id, issue.severity, old_status, new_status, created_at=issue.created_at)])
+
+
+def record_delete(db: Session, issue: models.Issue):
+    record(db, [transition(issue.id, issue.severity, issue.status, None)])
+
+
+# --- Reads ---
+def _current_backlog(db: Session, severity=None) -> int:
+    counter = models.IssueCounter
+    query = db.query(func.coalesce(func.sum(counter.count), 0)).filter(counter.status != DONE)
+    if severity is not None:
+        query = query.filter(counter.severity == severity)
+    return query.scalar()
+
+
+def trend(db: Session, granularity: str, periods: int, severity=None) -> list[dict]:
+    """The last ``periods`` buckets (the current, partial one included), oldest first.
+
+    Backlog is the open count at the end of each bucket, derived by walking
+    back from today's counters, so only the rollup rows in range are read.
+    """
+    step = GRANULARITIES[granularity]
+    end = truncate(datetime.utcnow(), granularity)
+    start = end - step * (periods - 1)
+
+    rollup = models.IssueRollup
+    query = (
+        db.query(rollup.bucket, *(func.sum(getattr(rollup, field)) for field in ROLLUP_FIELDS))
+        .filter(rollup.granularity == granularity, rollup.bucket >= start)
+        .group_by(rollup.bucket)
+    )
+    if severity is not None:
+        query = query.filter(rollup.severity == severity)
+    rows = {bucket: totals for bucket, *totals in query}
+
+    points = []
+    backlog = _current_backlog(db, severity)
+    for n in range(periods - 1, -1, -1):
+        bucket = start + step * n
+        opened, resolved, reopened, removed, resolution_count, resolution_seconds = rows.get(bucket, (0,) * 6)
+        points.append({
+            "bucket": bucket,
+            "opened": opened,
+            "resolved": resolved,
+            "reopened": reopened,
+            "backlog": backlog,
+            "mttr_hours": resolution_seconds / resolution_count / 3600 if resolution_count else None,
+        })
+        backlog -= opened + reopened - resolved - removed
+    points.reverse()
+    return points
+
+
+def mttr_by_severity(db: Session, days: int) -> list[dict]:
+    """Mean creation-to-DONE time per severity over issues resolved in the last ``days`` days."""
+    start = truncate(datetime.utcnow(), "day") - timedelta(days=days - 1)
+    rollup = models.IssueRollup
+    results = (
+        db.query(rollup.severity, func.sum(rollup.resolution_count), func.sum(rollup.resolution_seconds))
+        .filter(rollup.granularity == "day", rollup.bucket >= start)
+        .group_by(rollup.severity)
+        .having(func.sum(rollup.resolution_count) > 0)
+        .order_by(rollup.severity)
+        .all()
+    )
+    return [
+        {"severity": severity, "resolved": count, "mttr_hours": seconds / count / 3600}
+        for severity, count, seconds in results
+    ]
+
+
+# --- Maintenance ---
+def backfill(db: Session) -> int:
+    """Synthesize history for issues that have none (created before history existed).
+
+    Each gets a creation at created_at; DONE issues also get a resolution at
+    updated_at, the best available estimate of when they were closed. Those
+    resolutions are counted but not timed: on upgraded databases updated_at
+    was filled from created_at, so their durations would drag MTTR to zero.
+    """
+    issue, transitions = models.Issue, models.IssueTransition
+    has_history = select(transitions.issue_id).where(transitions.issue_id == issue.id).exists()
+    stmt = (
+        select(issue.id, issue.severity, issue.status, issue.created_at, issue.updated_at)
+        .where(~has_history)
+        .execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    count = 0
+    for batch in db.execute(stmt).partitions():
+        rows = []
+        for issue_id, severity, status, created_at, updated_at in batch:
+            created_at = created_at or datetime.utcnow()
+            if status == DONE:
+                rows.append(transition(issue_id, severity, None, models.Status.OPEN, at=created_at))
+                rows.append(transition(issue_id, severity, models.Status.OPEN, DONE,
+                                       at=max(updated_at or created_at, created_at)))
+            else:
+                rows.append(transition(issue_id, severity, None, status, at=created_at))
+        # Rollups are rebuilt afterwards, so only the history is written here.
+        db.execute(insert(transitions.__table__), rows)
+        count += len(batch)
+    db.commit()
+    return count
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every rollup row from issue_transitions; returns the rows written."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE issue_transitions IN SHARE MODE"))
+    table = models.IssueTransition.__table__
+    stmt = (
+        select(table.c.severity, table.c.from_status, table.c.to_status, table.c.at, table.c.resolution_seconds)
+        .execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    totals = defaultdict(lambda: [0] * len(ROLLUP_FIELDS))
+    for row in db.execute(stmt).mappings():
+        _accumulate(totals, row)
+
+    db.query(models.IssueRollup).delete()
+    if totals:
+        db.execute(insert(models.IssueRollup.__table__), [
+            {"granularity": granularity, "bucket": bucket, "severity": severity, **dict(zip(ROLLUP_FIELDS, values))}
+            for (granularity, bucket, severity), values in totals.items()
+        ])
+    # Cached trend responses and their ETags may hold the old rollups.
+    caching.mark_changed(db, caching.ISSUES)
+    db.commit()
+    return len(totals)
+
+
+if __name__ == "__main__":
+    # python -m app.history [backfill|rebuild]
+    from app.database import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    with SessionLocal() as db:
+        if command == "backfill":
+            print(f"✅ Backfilled history for {backfill(db)} issue(s).")
+        print(f"✅ Rebuilt {rebuild(db)} rollup row(s).")
@@ -1,5 +1,32 @@
 from app.models import Base
-from app.database import engine
+from app.database import engine, SessionLocal
+from app import counters, history, partitions, search, upgrade
 
 Base.metadata.create_all(bind=engine)
 print("✅ Tables created.")
+
+# Columns and indexes added since an existing database was created.
+with engine.begin() as connection:
+    upgrade.install(connection)
+print("✅ Columns up to date.")
+
+# Import keys and (on PostgreSQL) the partitioned issues layout.
+with engine.begin() as connection:
+    partitions.install(connection)
+print("✅ Issue partitions ready.")
+
+# Databases created before full-text search need its column/index or FTS table.
+with engine.begin() as connection:
+    search.install(connection)
+print("✅ Search index ready.")
+
+# Seed the insight counters from any issues that predate them.
+with SessionLocal() as db:
+    counters.rebuild(db)
+print("✅ Insight counters rebuilt.")
+
+# Give pre-existing issues a synthetic history, then recompute the trend rollups.
+with SessionLocal() as db:
+    backfilled = history.backfill(db)
+    history.rebuild(db)
+print(f"✅ Status history ready ({backfilled} issue(s) backfilled).")
@@ -0,0 +1,277 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import hashing
+from app.database import async_engine, pool_metrics
+
+logger = logging.getLogger(__name__)
+
+# --- Config ---
+# A request running more statements than this is logged; usually an N+1.
+REQUEST_QUERY_BUDGET = int(os.getenv("REQUEST_QUERY_BUDGET", "10"))
+# The sampling profiler (GET /debug/profile) is off unless explicitly enabled.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+PROFILE_MAX_SECONDS = 60
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+# --- Metric types (Prometheus text format) ---
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    le = _labels(self.labelnames, labels, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+REQUEST_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.", REQUEST_LABELS,
+)
+requests_total = Counter("http_requests_total", "Requests served.", REQUEST_LABELS + ("status",))
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements run per request.", REQUEST_LABELS, QUERY_COUNT_BUCKETS,
+)
+query_duration = Histogram("db_query_duration_seconds", "Time spent in SQL statements per request.", REQUEST_LABELS)
+query_budget_exceeded = Counter(
+    "http_request_query_budget_exceeded_total", "Requests that ran more than REQUEST_QUERY_BUDGET statements.",
+    REQUEST_LABELS,
+)
+
+METRICS = [request_duration, requests_total, request_queries, query_duration, query_budget_exceeded]
+
+
+def _gauge(name: str, help: str, value, kind: str = "gauge") -> list[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+def _process_metrics() -> list[str]:
+    # Figures app.database and app.hashing already keep for their admin endpoints.
+    pool = async_engine.pool
+    lines = []
+    lines += _gauge("db_pool_checkouts_total", "Connections checked out of the pool.", pool_metrics.checkouts, "counter")
+    lines += _gauge("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection.",
+                    pool_metrics.wait_total, "counter")
+    if hasattr(pool, "checkedout"):
+        lines += _gauge("db_pool_checked_out", "Connections currently in use.", pool.checkedout())
+    lines += _gauge("password_hash_completed_total", "bcrypt operations completed.",
+                    hashing.metrics.completed, "counter")
+    lines += _gauge("password_hash_rejected_total", "Logins shed because the hash pool was saturated.",
+                    hashing.metrics.rejected, "counter")
+    lines += _gauge("password_hash_seconds_total", "Time spent hashing.", hashing.metrics.hash_time_total, "counter")
+    lines += _gauge("password_hash_in_flight", "Hash jobs running or queued.", hashing.metrics.snapshot()["in_flight"])
+    return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += _process_metrics()
+    return "\n".join(lines) + "\n"
+
+
+# --- Per-request SQL accounting ---
+class RequestStats:
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+# Set by MetricsMiddleware. Worker threads and run_sync greenlets see a copy of
+# the request's context, which still points at the same RequestStats object.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """The running request's SQL totals, or None outside MetricsMiddleware."""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute.
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+# Listening on the Engine class covers the primary, async and replica
+# engines alike, including replicas added after import.
+event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+event.listen(Engine, "handle_error", _handle_error)
+
+
+# --- Middleware ---
+def _route_label(scope) -> str:
+    # The route template ("/issues/{issue_id}"), not the raw path, keeps
+    # label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Record latency, status and SQL statement counts per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            labels = (scope["method"], _route_label(scope))
+            request_duration.observe(elapsed, labels)
+            requests_total.inc(labels + (str(status_code),))
+            request_queries.observe(stats.queries, labels)
+            query_duration.observe(stats.query_seconds, labels)
+            if stats.queries > REQUEST_QUERY_BUDGET:
+                query_budget_exceeded.inc(labels)
+                logger.warning(
+                    "%s %s ran %d SQL statements (budget %d) in %.1f ms",
+                    *labels, stats.queries, REQUEST_QUERY_BUDGET, 1000 * elapsed,
+                )
+
+
+# --- Sampling profiler ---
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval; one capture at a time.
+
+    Output is in collapsed-stack format ("frame;frame;frame count"), which
+    flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def capture(self, seconds: float) -> Optional[str]:
+        """Sample for ``seconds`` and return collapsed stacks, or None if a capture is already running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            return self._collapse(self._sample(seconds))
+        finally:
+            self._busy.release()
+
+    def _sample(self, seconds: float) -> _Tally:
+        me = threading.get_ident()
+        names = {}
+        stacks = _Tally()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+        return stacks
+
+    @staticmethod
+    def _collapse(stacks: _Tally) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+profiler = SamplingProfiler(PROFILE_INTERVAL_SECONDS)
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, Enum, Float, ForeignKey, DateTime, Index, DDL, event, false
 from sqlalchemy.orm import relationship, declarative_base
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 import enum
 
 Base = declarative_base()
 
+# --- Timestamps ---
+# DateTime columns hold naive UTC (datetime.utcnow). Aware inputs must be
+# converted first: SQLite silently drops the offset, PostgreSQL applies the
+# session TimeZone, and asyncpg rejects them outright.
+def naive_utc(at: Optional[datetime]) -> Optional[datetime]:
+    if at is None or at.tzinfo is None:
+        return at
+    return at.astimezone(timezone.utc).replace(tzinfo=None)
+
 # --- User roles ---
 class UserRole(str, enum.Enum):
     ADMIN = "ADMIN"
@@ -18,6 +28,8 @@ class User(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     hashed_password = Column(String, nullable=False)
     role = Column(Enum(UserRole), default=UserRole.REPORTER, nullable=False)
+    # Bumped whenever the role changes; tokens minted for an older version are rejected.
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     issues = relationship("Issue", back_populates="reporter")
 
@@ -38,6 +50,16 @@ class Status(str, enum.Enum):
 # --- Issue model ---
 class Issue(Base):
     __tablename__ = "issues"
+    # Composite indexes backing keyset pagination on (created_at, id),
+    # optionally narrowed by one equality filter.
+    __table_args__ = (
+        Index("ix_issues_created_at_id", "created_at", "id"),
+        Index("ix_issues_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_issues_severity_created_at_id", "severity", "created_at", "id"),
+        Index("ix_issues_reporter_created_at_id", "reporter_id", "created_at", "id"),
+        # Export watermark scans ("everything updated since ...").
+        Index("ix_issues_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -47,6 +69,110 @@ class Issue(Base):
     severity = Column(Enum(Severity), default=Severity.LOW)
     status = Column(Enum(Status), default=Status.OPEN)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Caller-supplied import key (e.g. "jira:PROJ-123"); uniqueness lives in
+    # issue_import_keys because a partitioned table cannot enforce it.
+    idempotency_key = Column(String, nullable=True, index=True)
+    # Old DONE issues moved out of the hot path by app.partitions.archive.
+    # On PostgreSQL this is the top-level partition key.
+    archived = Column(Boolean, nullable=False, default=False, server_default=false())
 
     reporter_id = Column(Integer, ForeignKey("users.id"))
     reporter = relationship("User", back_populates="issues")
+
+
+# One row per idempotency key ever imported; claimed before the issue is
+# inserted so a re-sent record is skipped.
+class IssueImportKey(Base):
+    __tablename__ = "issue_import_keys"
+
+    key = Column(String, primary_key=True)
+
+
+# --- Insight counters ---
+# One row per (severity, status) bucket, maintained in the same transaction
+# as issue writes so dashboard reads never scan the issues table.
+class IssueCounter(Base):
+    __tablename__ = "issue_counters"
+
+    severity = Column(Enum(Severity), primary_key=True)
+    status = Column(Enum(Status), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# --- Status history ---
+# Append-only: one row per creation, status change or deletion. There is no
+# foreign key to issues so history outlives deleted issues.
+class IssueTransition(Base):
+    __tablename__ = "issue_transitions"
+    __table_args__ = (
+        Index("ix_issue_transitions_issue_id_at", "issue_id", "at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    issue_id = Column(Integer, nullable=False)
+    severity = Column(Enum(Severity), nullable=False)
+    # NULL from_status marks a creation, NULL to_status a deletion.
+    from_status = Column(Enum(Status), nullable=True)
+    to_status = Column(Enum(Status), nullable=True)
+    at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Creation-to-DONE time, set on transitions into DONE.
+    resolution_seconds = Column(Float, nullable=True)
+
+
+# Hourly and daily totals per severity, maintained in the same transaction
+# as each transition so trend reads never touch issue_transitions.
+class IssueRollup(Base):
+    __tablename__ = "issue_rollups"
+
+    granularity = Column(String(4), primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)
+    severity = Column(Enum(Severity), primary_key=True)
+    opened = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
+    reopened = Column(Integer, nullable=False, default=0)
+    # Deleted while still open (so no longer part of the backlog).
+    removed = Column(Integer, nullable=False, default=0)
+    resolution_count = Column(Integer, nullable=False, default=0)
+    resolution_seconds = Column(Float, nullable=False, default=0)
+
+
+# --- Full-text search DDL ---
+# Not mapped on the model: PostgreSQL keeps a generated tsvector column with
+# a GIN index, SQLite an external-content FTS5 table synced by triggers.
+# app.search.install() replays the same statements on existing databases.
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE issues ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_issues_search_vector ON issues USING GIN (search_vector)",
+]
+
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5("
+    "title, description, content='issues', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS issues_fts_insert AFTER INSERT ON issues BEGIN "
+    "INSERT INTO issues_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS issues_fts_delete AFTER DELETE ON issues BEGIN "
+    "INSERT INTO issues_fts(issues_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS issues_fts_update AFTER UPDATE OF title, description ON issues BEGIN "
+    "INSERT INTO issues_fts(issues_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO issues_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Issue.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Issue.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+
+# --- Collection versions ---
+# Bumped once per committed write to a collection; read endpoints derive
+# their ETag from it (see app/caching.py).
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
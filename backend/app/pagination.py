@@ -0,0 +1,120 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+from app import models
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Sort keys accepted by the list endpoints. Every order is keyset-paginated
+# on (created_at, id) so a page is a bounded range scan over the indexes
+# declared on models.Issue.
+SORT_NEWEST = "-created_at"
+SORT_OLDEST = "created_at"
+# Grouped orders: one group after another in a fixed order, newest first
+# within each. A page walks the groups it spans, each a range scan on the
+# (group column, created_at, id) index. The order is spelled out here
+# because enum columns sort differently per dialect.
+SORT_SEVERITY = "-severity"
+SORT_STATUS = "status"
+GROUPED_SORTS = {
+    SORT_SEVERITY: (models.Issue.severity, [models.Severity.HIGH, models.Severity.MEDIUM, models.Severity.LOW]),
+    SORT_STATUS: (models.Issue.status, list(models.Status)),
+}
+SORT_OPTIONS = (SORT_NEWEST, SORT_OLDEST, SORT_SEVERITY, SORT_STATUS)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# --- Cursor encoding ---
+def encode_position(position: dict) -> str:
+    raw = json.dumps(position)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_position(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+
+def encode_cursor(issue, sort: str = SORT_NEWEST) -> str:
+    position = {"c": issue.created_at.isoformat(), "i": issue.id}
+    if sort in GROUPED_SORTS:
+        group = getattr(issue, GROUPED_SORTS[sort][0].key)
+        position["g"] = getattr(group, "value", group)
+    return encode_position(position)
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    position = decode_position(cursor)
+    try:
+        return datetime.fromisoformat(position["c"]), int(position["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# --- Query helpers ---
+def apply_filters(query, status=None, severity=None, reporter_id: Optional[int] = None):
+    if status is not None:
+        query = query.filter(models.Issue.status == status)
+    if severity is not None:
+        query = query.filter(models.Issue.severity == severity)
+    if reporter_id is not None:
+        query = query.filter(models.Issue.reporter_id == reporter_id)
+    return query
+
+
+def apply_keyset(query, cursor: Optional[str], sort: str = SORT_NEWEST):
+    created_at, issue_id = models.Issue.created_at, models.Issue.id
+
+    if cursor:
+        # Row-value comparison lets the planner seek straight into the
+        # (..., created_at, id) index instead of filtering an OR expansion.
+        position = tuple_(created_at, issue_id)
+        last = tuple_(*decode_cursor(cursor))
+        query = query.filter(position > last if sort == SORT_OLDEST else position < last)
+
+    if sort == SORT_OLDEST:
+        return query.order_by(created_at.asc(), issue_id.asc())
+    return query.order_by(created_at.desc(), issue_id.desc())
+
+
+def _fetch_grouped(query, limit: int, cursor: Optional[str], sort: str) -> list:
+    column, groups = GROUPED_SORTS[sort]
+    first = 0
+    if cursor:
+        try:
+            first = [group.value for group in groups].index(decode_position(cursor).get("g"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    rows = []
+    for n, group in enumerate(groups[first:]):
+        # Only the group the cursor stopped in resumes mid-way.
+        within = apply_keyset(query.filter(column == group), cursor if n == 0 else None)
+        rows += within.limit(limit + 1 - len(rows)).all()
+        if len(rows) > limit:
+            break
+    return rows
+
+
+def fetch_page(query, limit: int, cursor: Optional[str] = None, sort: str = SORT_NEWEST):
+    """Return (rows, next_cursor) for one keyset page of ``query``."""
+    if sort in GROUPED_SORTS:
+        rows = _fetch_grouped(query, limit, cursor, sort)
+    else:
+        rows = apply_keyset(query, cursor, sort).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1], sort)
+    return rows, None
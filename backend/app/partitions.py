@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import false, inspect, select, text, true, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import caching, models
+
+logger = logging.getLogger(__name__)
+
+# --- Config ---
+# DONE issues untouched for this long are moved to the archive.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "5000"))
+# Monthly hot partitions are created this many months ahead of now.
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_CHECK_INTERVAL_SECONDS = 6 * 3600
+
+# PostgreSQL layout:
+#   issues                LIST (archived)
+#   ├── issues_archive    archived = true
+#   └── issues_hot        archived = false, RANGE (created_at)
+#       ├── issues_hot_YYYY_MM ...
+#       └── issues_hot_default
+# Hot queries filter on archived = false, so the planner never opens the
+# archive; within the hot side, date-bounded scans touch only their months.
+# SQLite has no partitioning: there the archived flag is just a filter.
+_LOCK_KEY = "issues_partitions"
+
+
+def hot_only(query, include_archived: bool = False):
+    """Restrict an Issue query to the hot partition unless the caller asked for the archive."""
+    if include_archived:
+        return query
+    # A literal (not a bound parameter) so PostgreSQL prunes at plan time.
+    return query.filter(models.Issue.archived == false())
+
+
+# --- Partition management (PostgreSQL) ---
+def _month_start(at: datetime) -> datetime:
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(at: datetime) -> datetime:
+    return _month_start(_month_start(at) + timedelta(days=32))
+
+
+def _is_partitioned(connection) -> bool:
+    return bool(connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('issues')"
+    )).scalar())
+
+
+def ensure_partitions(connection, since: Optional[datetime] = None) -> list[str]:
+    """Create any missing monthly hot partitions from ``since`` (default: now) to PARTITION_MONTHS_AHEAD ahead."""
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY})
+    now = datetime.utcnow()
+    month = _month_start(since or now)
+    last = _month_start(now)
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        last = _next_month(last)
+
+    created = []
+    while month <= last:
+        name = f"issues_hot_{month:%Y_%m}"
+        exists = connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists is None:
+            connection.execute(text(
+                f"CREATE TABLE {name} PARTITION OF issues_hot "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+            ))
+            created.append(name)
+        month = _next_month(month)
+    return created
+
+
+def _convert(connection, since: Optional[datetime] = None):
+    """Rebuild an existing plain issues table as the partitioned layout, keeping its rows and id sequence."""
+    existing = {column["name"] for column in inspect(connection).get_columns("issues")}
+    # Generated columns (search_vector) are recomputed, not copied.
+    columns = ", ".join(column.name for column in models.Issue.__table__.columns if column.name in existing)
+    connection.execute(text("UPDATE issues SET created_at = now() WHERE created_at IS NULL"))
+    connection.execute(text("ALTER TABLE issues RENAME TO issues_unpartitioned"))
+    # Free the index and constraint names for the new table.
+    connection.execute(text("""
+        DO $$
+        DECLARE r record;
+        BEGIN
+            FOR r IN SELECT conname FROM pg_constraint
+                     WHERE conrelid = 'issues_unpartitioned'::regclass AND contype IN ('p', 'u', 'f') LOOP
+                EXECUTE format('ALTER TABLE issues_unpartitioned DROP CONSTRAINT %I', r.conname);
+            END LOOP;
+            FOR r IN SELECT indexname FROM pg_indexes WHERE tablename = 'issues_unpartitioned' LOOP
+                EXECUTE format('DROP INDEX %I', r.indexname);
+            END LOOP;
+        END $$
+    """))
+    connection.execute(text(
+        "CREATE TABLE issues (LIKE issues_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED) "
+        "PARTITION BY LIST (archived)"
+    ))
+    # Unique keys on a partitioned table must contain every partition key.
+    connection.execute(text("ALTER TABLE issues ADD PRIMARY KEY (id, archived, created_at)"))
+    connection.execute(text("ALTER TABLE issues ADD FOREIGN KEY (reporter_id) REFERENCES users (id)"))
+    connection.execute(text("CREATE TABLE issues_archive PARTITION OF issues FOR VALUES IN (true)"))
+    connection.execute(text(
+        "CREATE TABLE issues_hot PARTITION OF issues FOR VALUES IN (false) PARTITION BY RANGE (created_at)"
+    ))
+    connection.execute(text("CREATE TABLE issues_hot_default PARTITION OF issues_hot DEFAULT"))
+
+    oldest = connection.execute(text("SELECT min(created_at) FROM issues_unpartitioned")).scalar()
+    ensure_partitions(connection, since=min(filter(None, (oldest, since)), default=None))
+
+    connection.execute(text(f"INSERT INTO issues ({columns}) SELECT {columns} FROM issues_unpartitioned"))
+    connection.execute(text("ALTER SEQUENCE IF EXISTS issues_id_seq OWNED BY issues.id"))
+    connection.execute(text("DROP TABLE issues_unpartitioned"))
+
+    # Indexes declared on the model (and the search index) are created on
+    # the parent, which builds one per partition.
+    for index in models.Issue.__table__.indexes:
+        index.create(connection, checkfirst=True)
+    for statement in models.POSTGRES_SEARCH_DDL:
+        connection.execute(text(statement))
+
+
+def install(connection, since: Optional[datetime] = None):
+    """Bring an existing database up to the hot/archive layout.
+
+    Creates the import-key table where missing and, on PostgreSQL, converts
+    issues into the partitioned layout (once; it takes an exclusive lock and
+    copies every row) and tops up monthly partitions, from ``since`` if
+    given. Expects app.upgrade.install to have added the archived column.
+    """
+    dialect = connection.dialect.name
+    issue_columns = {column["name"] for column in inspect(connection).get_columns("issues")}
+
+    # Keys of issues imported before issue_import_keys existed.
+    key_table = models.IssueImportKey.__table__
+    key_table.create(connection, checkfirst=True)
+    if "idempotency_key" in issue_columns:
+        connection.execute(text(
+            "INSERT INTO issue_import_keys (key) SELECT DISTINCT idempotency_key FROM issues "
+            "WHERE idempotency_key IS NOT NULL ON CONFLICT DO NOTHING"
+        ))
+
+    if dialect == "postgresql":
+        if not _is_partitioned(connection):
+            _convert(connection, since)
+        ensure_partitions(connection, since)
+
+
+# --- Archival ---
+def archive(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move DONE issues not updated for ``older_than_days`` to the archive, one batch per transaction.
+
+    Flipping archived makes PostgreSQL move each row into issues_archive.
+    Counters and history are untouched: the issues still exist, as DONE.
+    """
+    issue = models.Issue.__table__
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+    while True:
+        batch = (
+            select(issue.c.id)
+            .where(issue.c.archived == false(), issue.c.status == models.Status.DONE, issue.c.updated_at < cutoff)
+            .limit(batch_size)
+        )
+        ids = db.execute(batch).scalars().all()
+        if not ids:
+            return moved
+        # updated_at is left alone so the archive keeps each issue's closing time.
+        db.execute(
+            update(issue)
+            .where(issue.c.id.in_(ids), issue.c.archived == false())
+            .values(archived=true(), updated_at=issue.c.updated_at)
+        )
+        caching.mark_changed(db, caching.ISSUES)
+        db.commit()
+        moved += len(ids)
+
+
+# --- Background upkeep ---
+def _maintain():
+    from app.database import engine
+
+    if engine.dialect.name != "postgresql":
+        return
+    try:
+        with engine.begin() as connection:
+            if _is_partitioned(connection):
+                created = ensure_partitions(connection)
+                if created:
+                    logger.info("Created issue partitions: %s", ", ".join(created))
+    except SQLAlchemyError:
+        logger.exception("Could not create upcoming issue partitions")
+
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _upkeep_loop():
+    while True:
+        await asyncio.to_thread(_maintain)
+        await asyncio.sleep(PARTITION_CHECK_INTERVAL_SECONDS)
+
+
+def start():
+    global _task
+    if _task is None:
+        _task = asyncio.get_running_loop().create_task(_upkeep_loop())
+
+
+def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+
+
+if __name__ == "__main__":
+    # python -m app.partitions [install|archive [days]]
+    from app.database import SessionLocal, engine
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "archive"
+    if command == "install":
+        with engine.begin() as connection:
+            install(connection)
+        print("✅ Issue partitions ready.")
+    else:
+        days = int(sys.argv[2]) if len(sys.argv) > 2 else ARCHIVE_AFTER_DAYS
+        with SessionLocal() as db:
+            print(f"✅ Archived {archive(db, days)} DONE issue(s) older than {days} days.")
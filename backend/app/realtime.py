@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app import caching
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "issue_insights"
+
+# Deltas arriving within this window are merged into a single frame.
+COALESCE_SECONDS = 0.25
+
+# Frames buffered per subscriber before it is considered too slow and told
+# to resync from a fresh snapshot instead.
+SUBSCRIBER_QUEUE_SIZE = 32
+
+_PENDING_KEY = "insight_deltas"
+_VERSION_KEY = "insight_version"
+
+RESYNC = json.dumps({"type": "resync"})
+
+
+def _merge(commits) -> list:
+    total: Counter = Counter()
+    for changes in commits:
+        total.update(changes)
+    return [
+        {"severity": severity, "status": status, "delta": delta}
+        for (severity, status), delta in sorted(total.items())
+        if delta
+    ]
+
+
+# --- Frames ---
+class DeltaFrame:
+    """One coalesced flush, keeping each commit's changes under its issues version.
+
+    ``version`` is the newest commit folded in. Every subscriber gets the same
+    encoded text, except a connection whose snapshot already includes some
+    of the commits (see ``text_after``).
+    """
+
+    def __init__(self, commits: dict):
+        self.commits = commits
+        self.version = max(commits)
+        self.text = self._encode(_merge(commits.values()))
+
+    def _encode(self, changes: list) -> Optional[str]:
+        if not changes:
+            return None
+        return json.dumps({"type": "delta", "version": self.version, "changes": changes})
+
+    def text_after(self, version: int) -> Optional[str]:
+        """The frame without commits at or before ``version``; None if nothing is left."""
+        if min(self.commits) > version:
+            return self.text
+        return self._encode(_merge(changes for v, changes in self.commits.items() if v > version))
+
+
+# --- Broadcaster ---
+class InsightsBroadcaster:
+    """In-process fan-out of coalesced (severity, status) count deltas."""
+
+    def __init__(self, window: float = COALESCE_SECONDS):
+        self.window = window
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: set[asyncio.Queue] = set()
+        # issues version -> that commit's (severity, status) deltas
+        self._pending: dict[int, Counter] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def add(self, version: int, changes: list):
+        """Merge one commit's ``changes``, made at issues ``version``, into the pending frame.
+
+        Must run on the event loop.
+        """
+        pending = self._pending.setdefault(version, Counter())
+        for change in changes:
+            pending[(change["severity"], change["status"])] += change["delta"]
+        if self._flush_handle is None:
+            self._flush_handle = self.loop.call_later(self.window, self._flush)
+
+    def add_threadsafe(self, version: int, changes: list):
+        if self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.add, version, changes)
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        if not pending or not self._subscribers:
+            return
+
+        frame = DeltaFrame(pending)
+        if frame.text is None:
+            return
+        for queue in self._subscribers:
+            if queue.full():
+                # The client missed frames; its totals can no longer be patched.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+            else:
+                queue.put_nowait(frame)
+
+
+broadcaster = InsightsBroadcaster()
+
+
+# --- Publishing from write transactions ---
+def record_delta(db: Session, severity, status, delta: int):
+    """Queue a bucket delta on ``db``; it is published only if the transaction commits."""
+    pending = db.info.setdefault(_PENDING_KEY, Counter())
+    pending[(getattr(severity, "value", severity), getattr(status, "value", status))] += delta
+    # The issues version this commit gets is the delta's sequence number.
+    caching.mark_changed(db, caching.ISSUES)
+
+
+def _take_pending(session: Session) -> list:
+    pending = session.info.pop(_PENDING_KEY, None) or {}
+    return [
+        {"severity": severity, "status": status, "delta": delta}
+        for (severity, status), delta in pending.items()
+        if delta
+    ]
+
+
+def _uses_notify(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+# Registered on Session itself so both SessionLocal sessions and the sync
+# sessions behind AsyncSessionLocal publish their deltas.
+@event.listens_for(Session, "before_commit")
+def _notify_before_commit(session: Session):
+    if _PENDING_KEY not in session.info:
+        return
+    version = caching.bump_versions(session)[caching.ISSUES]
+    if _uses_notify(session):
+        # NOTIFY is transactional: Postgres delivers it to every listening
+        # worker (including this one) only once the transaction commits.
+        changes = _take_pending(session)
+        if changes:
+            session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": json.dumps({"version": version, "changes": changes})},
+            )
+    else:
+        session.info[_VERSION_KEY] = version
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session):
+    # Without LISTEN/NOTIFY (e.g. SQLite) fan-out is limited to this process.
+    version = session.info.pop(_VERSION_KEY, None)
+    if _PENDING_KEY in session.info:
+        broadcaster.add_threadsafe(version, _take_pending(session))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_VERSION_KEY, None)
+
+
+# --- Cross-worker listener (PostgreSQL LISTEN) ---
+class NotifyListener:
+    """Feeds NOTIFY payloads from other workers into the local broadcaster."""
+
+    def __init__(self, target: InsightsBroadcaster):
+        self.target = target
+        self._connection = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        if engine.dialect.name != "postgresql":
+            return
+        pooled = engine.raw_connection()
+        pooled.detach()
+        connection = pooled.dbapi_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        self._connection = connection
+        loop.add_reader(connection.fileno(), self._drain)
+
+    def _drain(self):
+        connection = self._connection
+        try:
+            connection.poll()
+        except Exception:
+            logger.exception("LISTEN connection failed; live insights limited to this worker")
+            self.stop(self.target.loop)
+            return
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            try:
+                payload = json.loads(notify.payload)
+                self.target.add(payload["version"], payload["changes"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Ignoring malformed insight notification: %r", notify.payload)
+
+    def stop(self, loop: Optional[asyncio.AbstractEventLoop]):
+        if self._connection is None:
+            return
+        if loop is not None and not loop.is_closed():
+            loop.remove_reader(self._connection.fileno())
+        self._connection.close()
+        self._connection = None
+
+
+listener = NotifyListener(broadcaster)
+
+
+def start(loop: asyncio.AbstractEventLoop):
+    broadcaster.bind(loop)
+    listener.start(loop)
+
+
+def stop():
+    listener.stop(broadcaster.loop)
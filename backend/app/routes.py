@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Response, Query, status
+from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import func
 
-import shutil
-import uuid
+from datetime import datetime
+from typing import Literal, Optional
+
+import asyncio
 import os
-import requests
 
-from app import models, schemas, auth
-from app.database import get_db
+from app import models, schemas, auth, pagination, export, counters, realtime, google, storage, bulk, triage, search, caching, serialization, metrics, history, partitions
+from app.database import get_async_db, get_async_read_db, AsyncSessionLocal, pool_status
 
 router = APIRouter()
 
@@ -18,164 +21,411 @@ router.include_router(auth.router)
 
 # --- Traditional Login ---
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await auth.authenticate(db, form_data.username, form_data.password)
 
-    token = auth.create_access_token({"sub": str(user.id)})
+    token = auth.create_access_token(auth.token_claims(user))
     return {"access_token": token, "token_type": "bearer"}
 
 
 # --- Google OAuth Login ---
 @router.post("/login/google")
-async def login_with_google(request: Request, db: Session = Depends(get_db)):
+async def login_with_google(request: Request, db: AsyncSession = Depends(get_async_db)):
     data = await request.json()
     token = data.get("token")
     if not token:
         raise HTTPException(status_code=400, detail="Google ID token missing")
 
-    resp = requests.get(f"https://oauth2.googleapis.com/tokeninfo?id_token={token}")
-    if resp.status_code != 200:
-        raise HTTPException(status_code=401, detail="Invalid Google token")
-
-    info = resp.json()
-    email = info.get("email")
-    if not email:
-        raise HTTPException(status_code=400, detail="Email not found in Google token")
-
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user:
-        user = models.User(email=email, hashed_password="", role="REPORTER")
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    info = await google.verify_id_token(token)
+    user = await auth.get_or_create_oauth_user(db, info["email"])
 
-    access_token = auth.create_access_token(data={"sub": str(user.id), "email": user.email})
+    access_token = auth.create_access_token(data=auth.token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-# --- Uploads Directory ---
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-
 # --- Create Issue ---
-@router.post("/issues/", response_model=schemas.IssueOut)
-def create_issue(
-    title: str = Form(...),
-    description: str = Form(...),
-    severity: schemas.Severity = Form(...),
-    file: UploadFile = File(None),
-    db: Session = Depends(get_db),
-    user: models.User = Depends(auth.require_reporter),
-):
-    filename = None
-    if file:
-        file_ext = os.path.splitext(file.filename)[1]
-        filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
+def _insert_issue(db: Session, reporter_id: int, title: str, description: str,
+                  severity: schemas.Severity, file_path: Optional[str]) -> models.Issue:
     new_issue = models.Issue(
         title=title,
         description=description,
         severity=severity,
-        reporter_id=user.id,
-        file_path=filename
+        reporter_id=reporter_id,
+        file_path=file_path
     )
     db.add(new_issue)
+    db.flush()
+    counters.record_create(db, new_issue)
+    history.record_create(db, new_issue)
     db.commit()
     db.refresh(new_issue)
     return new_issue
 
 
+@router.post("/issues/", response_model=schemas.IssueOut)
+async def create_issue(
+    title: str = Form(...),
+    description: str = Form(...),
+    severity: schemas.Severity = Form(...),
+    file: UploadFile = File(None),
+    db: AsyncSession = Depends(get_async_db),
+    user: auth.Principal = Depends(auth.require_reporter),
+):
+    filename = await storage.save_upload(file) if file else None
+    return await db.run_sync(_insert_issue, user.id, title, description, severity, filename)
+
+
+# --- Bulk Import (ADMIN only) ---
+@router.post("/issues/bulk")
+async def bulk_create_issues(request: Request,
+                             db: AsyncSession = Depends(get_async_db),
+                             user: auth.Principal = Depends(auth.require_admin)):
+    """Import a JSON array or NDJSON stream of issues; see app/bulk.py."""
+    importer = bulk.BulkImporter(default_reporter_id=user.id)
+    async for batch in bulk.read_batches(request):
+        await db.run_sync(importer.ingest, batch)
+    return importer.summary()
+
+
+# --- Download Attachment ---
+@router.get("/issues/{issue_id}/attachment")
+async def download_attachment(issue_id: int,
+                              request: Request,
+                              db: AsyncSession = Depends(get_async_read_db),
+                              user: auth.Principal = Depends(auth.get_current_user)):
+    issue = await db.get(models.Issue, issue_id)
+    if not issue or (user.role == "REPORTER" and issue.reporter_id != user.id):
+        raise HTTPException(status_code=404, detail="Issue not found")
+    if not issue.file_path:
+        raise HTTPException(status_code=404, detail="Issue has no attachment")
+
+    path, digest = storage.resolve(issue.file_path)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    # Content-addressed blobs never change, so the digest is a strong ETag
+    # and the response can be cached indefinitely.
+    # Never let the browser second-guess the declared type.
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if digest:
+        etag = f'"{digest}"'
+        headers.update({"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"})
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+    # FileResponse answers Range/If-Range itself and hands the file to the
+    # server via http.response.pathsend (sendfile) where supported.
+    media_type = storage.media_type(issue.file_path)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers=headers,
+        content_disposition_type=storage.disposition_type(media_type),
+        filename=os.path.basename(issue.file_path),
+    )
+
+
+# --- Issue Listing (keyset paginated) ---
+def list_page_params(
+    cursor: Optional[str] = None,
+    limit: int = Query(pagination.DEFAULT_PAGE_SIZE, ge=1, le=pagination.MAX_PAGE_SIZE),
+    sort: str = Query(pagination.SORT_NEWEST, enum=list(pagination.SORT_OPTIONS)),
+    status: Optional[schemas.Status] = None,
+    severity: Optional[schemas.Severity] = None,
+    include_archived: bool = Query(False, description="Also return archived DONE issues"),
+):
+    return {"cursor": cursor, "limit": limit, "sort": sort, "status": status, "severity": severity,
+            "include_archived": include_archived}
+
+
+def _issue_page(db: Session, params: dict, reporter_id: Optional[int] = None):
+    # Plain column rows, not ORM entities: list responses are rendered straight
+    # from them by app.serialization.
+    query = partitions.hot_only(db.query(*serialization.ISSUE_OUT_COLUMNS), params["include_archived"])
+    query = pagination.apply_filters(query, params["status"], params["severity"], reporter_id)
+    return pagination.fetch_page(query, params["limit"], params["cursor"], params["sort"])
+
+
+async def _render_issue_page(db: AsyncSession, params: dict, reporter_id: Optional[int]):
+    rows, next_cursor = await db.run_sync(_issue_page, params, reporter_id=reporter_id)
+    body = serialization.dumps(serialization.issue_rows(rows))
+    return body, ({pagination.NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {})
+
+
 # --- Get Own Issues (REPORTER only) ---
 @router.get("/issues/my", response_model=list[schemas.IssueOut])
-def get_own_issues(db: Session = Depends(get_db),
-                   user: models.User = Depends(auth.require_reporter)):
-    return db.query(models.Issue).filter(models.Issue.reporter_id == user.id).all()
+async def get_own_issues(request: Request,
+                         params: dict = Depends(list_page_params),
+                         db: AsyncSession = Depends(get_async_read_db),
+                         user: auth.Principal = Depends(auth.require_reporter)):
+    return await caching.conditional_json(
+        request, db, f"user:{user.id}", lambda: _render_issue_page(db, params, user.id)
+    )
 
 
 # --- Get All Issues ---
 @router.get("/issues/", response_model=list[schemas.IssueOut])
-def list_issues(
-    db: Session = Depends(get_db),
-    user: models.User = Depends(auth.get_current_user)
+async def list_issues(
+    request: Request,
+    params: dict = Depends(list_page_params),
+    reporter_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: auth.Principal = Depends(auth.get_current_user)
+):
+    scope = "all"
+    if user.role == "REPORTER":
+        reporter_id = user.id
+        scope = f"user:{user.id}"
+    return await caching.conditional_json(
+        request, db, scope, lambda: _render_issue_page(db, params, reporter_id)
+    )
+
+
+# --- Full-text Search ---
+@router.get("/issues/search", response_model=list[schemas.IssueOut])
+async def search_issues(
+    q: str = Query(..., min_length=1, max_length=200),
+    params: dict = Depends(list_page_params),
+    reporter_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    user: auth.Principal = Depends(auth.get_current_user)
 ):
+    """Relevance-ranked search over titles and descriptions; same filters as /issues/."""
     if user.role == "REPORTER":
-        return db.query(models.Issue).filter(models.Issue.reporter_id == user.id).all()
-    else:
-        return db.query(models.Issue).all()
+        reporter_id = user.id
+    rows, next_cursor = await db.run_sync(
+        search.search_page, q, params["limit"], params["cursor"],
+        status=params["status"], severity=params["severity"], reporter_id=reporter_id,
+        include_archived=params["include_archived"],
+    )
+    headers = {pagination.NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return Response(content=serialization.dumps(rows), media_type="application/json", headers=headers)
+
+
+# --- Streaming Export (MAINTAINER / ADMIN) ---
+@router.get("/issues/export")
+def export_issues(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    status: Optional[schemas.Status] = None,
+    severity: Optional[schemas.Severity] = None,
+    reporter_id: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+    user: auth.Principal = Depends(auth.require_maintainer),
+):
+    body = export.EXPORTERS[format](
+        status=status,
+        severity=severity,
+        reporter_id=reporter_id,
+        updated_since=updated_since,
+    )
+    return StreamingResponse(
+        body,
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="issues.{format}"'},
+    )
+
+
+# --- Batch Triage ---
+@router.post("/issues/batch/status")
+async def batch_update_status(body: schemas.BatchStatusUpdate,
+                              db: AsyncSession = Depends(get_async_db),
+                              user: auth.Principal = Depends(auth.require_maintainer)):
+    return await db.run_sync(triage.update_status, body, body.new_status)
+
+
+@router.post("/issues/batch/delete")
+async def batch_delete(body: schemas.IssueSelection,
+                       db: AsyncSession = Depends(get_async_db),
+                       user: auth.Principal = Depends(auth.require_admin)):
+    return await db.run_sync(triage.delete_issues, body)
 
 
 # --- Update Issue Status ---
-@router.patch("/issues/{issue_id}", response_model=schemas.IssueOut)
-def update_issue(issue_id: int,
-                 status: schemas.Status,
-                 db: Session = Depends(get_db),
-                 user: models.User = Depends(auth.require_maintainer)):
+def _set_status(db: Session, issue_id: int, status: schemas.Status) -> models.Issue:
     issue = db.query(models.Issue).filter(models.Issue.id == issue_id).first()
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
 
+    counters.record_status_change(db, issue.severity, issue.status, status)
+    history.record_status_change(db, issue, issue.status, status)
     issue.status = status
+    if status != schemas.Status.DONE:
+        # Reopened issues move back to the hot partition.
+        issue.archived = False
     db.commit()
     db.refresh(issue)
     return issue
 
 
-# --- Delete Issue (ADMIN only) ---
-@router.delete("/issues/{issue_id}")
-def delete_issue(issue_id: int,
-                 db: Session = Depends(get_db),
-                 user: models.User = Depends(auth.require_admin)):
+@router.patch("/issues/{issue_id}", response_model=schemas.IssueOut)
+async def update_issue(issue_id: int,
+                       status: schemas.Status,
+                       db: AsyncSession = Depends(get_async_db),
+                       user: auth.Principal = Depends(auth.require_maintainer)):
+    return await db.run_sync(_set_status, issue_id, status)
+
 
+# --- Delete Issue (ADMIN only) ---
+def _delete_issue(db: Session, issue_id: int):
     issue = db.query(models.Issue).filter(models.Issue.id == issue_id).first()
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
 
+    counters.record_delete(db, issue)
+    history.record_delete(db, issue)
     db.delete(issue)
     db.commit()
+
+
+@router.delete("/issues/{issue_id}")
+async def delete_issue(issue_id: int,
+                       db: AsyncSession = Depends(get_async_db),
+                       user: auth.Principal = Depends(auth.require_admin)):
+    await db.run_sync(_delete_issue, issue_id)
     return {"msg": "Issue deleted"}
 
 
 # --- Insights Endpoints ---
+# All aggregates read the issue_counters buckets (see app/counters.py)
+# rather than grouping over the issues table, and are served through the
+# issues collection version (see app/caching.py).
+OPEN_STATUSES = [models.Status.OPEN]
+ACTIVE_STATUSES = [s for s in models.Status if s != models.Status.DONE]
+
+
+def _counts_response(request: Request, db: AsyncSession, statuses):
+    async def render():
+        return serialization.dumps(await db.run_sync(counters.severity_counts, statuses)), {}
+    return caching.conditional_json(request, db, "all", render)
+
+
 @router.get("/insights/severity-counts")
-def severity_counts(db: Session = Depends(get_db)):
-    results = (
-        db.query(models.Issue.severity, func.count(models.Issue.id))
-        .filter(models.Issue.status == "OPEN")
-        .group_by(models.Issue.severity)
-        .all()
-    )
-    return [{"severity": sev, "count": count} for sev, count in results]
+async def severity_counts(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return await _counts_response(request, db, OPEN_STATUSES)
 
 # ✅ Alias for frontend compatibility
 @router.get("/insights/")
-def insights_alias(db: Session = Depends(get_db)):
-    return severity_counts(db)
+async def insights_alias(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    return await severity_counts(request, db)
+
+
+# --- Trends (read from the status-history rollups) ---
+async def _trend_response(request: Request, db: AsyncSession, granularity: str, periods: int,
+                          severity: Optional[schemas.Severity]):
+    async def render():
+        return serialization.dumps(await db.run_sync(history.trend, granularity, periods, severity)), {}
+
+    # The window slides with the clock, so the current bucket is part of the cache key.
+    scope = f"all:{history.truncate(datetime.utcnow(), granularity).isoformat()}"
+    return await caching.conditional_json(request, db, scope, render)
 
 
-# --- Optional Dashboard Aggregates ---
 @router.get("/stats/daily")
-def get_issue_stats(db: Session = Depends(get_db),
-                    user: models.User = Depends(auth.get_current_user)):
-    results = db.query(
-        models.Issue.severity,
-        func.count(models.Issue.id).label("count")
-    ).filter(models.Issue.status == "OPEN").group_by(models.Issue.severity).all()
+async def get_daily_trend(request: Request,
+                          days: int = Query(30, ge=1, le=366),
+                          severity: Optional[schemas.Severity] = None,
+                          db: AsyncSession = Depends(get_async_read_db),
+                          user: auth.Principal = Depends(auth.get_current_user)):
+    """Opened/resolved/reopened counts, end-of-day backlog and MTTR for the last ``days`` days."""
+    return await _trend_response(request, db, "day", days, severity)
 
-    return [{"severity": severity, "count": count} for severity, count in results]
+
+@router.get("/stats/hourly")
+async def get_hourly_trend(request: Request,
+                           hours: int = Query(48, ge=1, le=24 * 14),
+                           severity: Optional[schemas.Severity] = None,
+                           db: AsyncSession = Depends(get_async_read_db),
+                           user: auth.Principal = Depends(auth.get_current_user)):
+    return await _trend_response(request, db, "hour", hours, severity)
+
+
+@router.get("/stats/mttr")
+async def get_mttr(request: Request,
+                   days: int = Query(30, ge=1, le=366),
+                   db: AsyncSession = Depends(get_async_read_db),
+                   user: auth.Principal = Depends(auth.get_current_user)):
+    """Mean time to resolution per severity over issues resolved in the last ``days`` days."""
+    async def render():
+        return serialization.dumps(await db.run_sync(history.mttr_by_severity, days)), {}
+
+    scope = f"all:{history.truncate(datetime.utcnow(), 'day').isoformat()}"
+    return await caching.conditional_json(request, db, scope, render)
+
+
+# --- Optional Dashboard Aggregates ---
 
 
 @router.get("/dashboard")
-def get_dashboard_data(db: Session = Depends(get_db), user: models.User = Depends(auth.get_current_user)):
-    result = (
-        db.query(models.Issue.severity, func.count(models.Issue.id))
-        .filter(models.Issue.status != "DONE")
-        .group_by(models.Issue.severity)
-        .all()
-    )
-    return [{"severity": severity, "count": count} for severity, count in result]
+async def get_dashboard_data(request: Request,
+                             db: AsyncSession = Depends(get_async_read_db),
+                             user: auth.Principal = Depends(auth.get_current_user)):
+    return await _counts_response(request, db, ACTIVE_STATUSES)
+
+
+# --- Connection Pool Stats (ADMIN only) ---
+@router.get("/stats/db-pool")
+async def db_pool_stats(user: auth.Principal = Depends(auth.require_admin)):
+    return pool_status()
+
+
+# --- Metrics & Profiling ---
+# Unauthenticated so Prometheus can scrape it; restrict it at the proxy.
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/debug/profile", include_in_schema=False)
+async def profile(seconds: float = Query(10, gt=0, le=metrics.PROFILE_MAX_SECONDS),
+                  user: auth.Principal = Depends(auth.require_admin)):
+    """Sample all threads for ``seconds``; returns collapsed stacks for a flame graph."""
+    if not metrics.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    stacks = await asyncio.to_thread(metrics.profiler.capture, seconds)
+    if stacks is None:
+        raise HTTPException(status_code=409, detail="A profile is already being captured")
+    return PlainTextResponse(stacks)
+
+
+# --- Live Insights (WebSocket) ---
+async def _insight_snapshot():
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(counters.snapshot)
+
+
+@router.websocket("/ws/insights")
+async def insights_socket(websocket: WebSocket):
+    """Send a bucket snapshot, then coalesced ``delta`` frames as issues change.
+
+    The snapshot and every delta carry the issues version they reflect; a
+    client skips deltas not newer than its snapshot. A ``resync`` frame
+    means the client fell behind and should reconnect for a fresh snapshot.
+    """
+    await websocket.accept()
+    # Subscribe first so no commit falls between the snapshot and the feed;
+    # commits the snapshot already counts are filtered out by version.
+    queue = realtime.broadcaster.subscribe()
+    sender = None
+    try:
+        version, buckets = await _insight_snapshot()
+        await websocket.send_json({"type": "snapshot", "version": version, "buckets": buckets})
+        sender = asyncio.create_task(_forward_frames(websocket, queue, version))
+        # Client messages are ignored; reading only surfaces the disconnect.
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+        realtime.broadcaster.unsubscribe(queue)
+
+
+async def _forward_frames(websocket: WebSocket, queue, snapshot_version: int):
+    while True:
+        frame = await queue.get()
+        if isinstance(frame, realtime.DeltaFrame):
+            frame = frame.text_after(snapshot_version)
+        if frame is not None:
+            await websocket.send_text(frame)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -44,6 +44,31 @@ class IssueCreate(BaseModel):
     severity: Severity = Severity.LOW
 
 
+class IssueImport(BaseModel):
+    title: str
+    description: Optional[str] = None
+    severity: Severity = Severity.LOW
+    status: Status = Status.OPEN
+    reporter_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    idempotency_key: Optional[str] = None
+
+
+# --- Batch triage ---
+
+class IssueSelection(BaseModel):
+    ids: Optional[List[int]] = None
+    status: Optional[Status] = None
+    severity: Optional[Severity] = None
+    reporter_id: Optional[int] = None
+    # 0 or less would select every issue while still passing as a filter.
+    older_than_days: Optional[int] = Field(None, ge=1)
+
+
+class BatchStatusUpdate(IssueSelection):
+    new_status: Status
+
+
 class IssueOut(BaseModel):
     id: int
     title: str
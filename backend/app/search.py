@@ -0,0 +1,85 @@
+import re
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Float, cast, column, func, literal_column, table, text, tuple_
+from sqlalchemy.orm import Session
+
+from app import models, pagination, partitions, serialization
+
+# The FTS5 shadow table, addressed only in queries (never created via metadata).
+_fts = table("issues_fts", column("rowid"))
+_fts_match = literal_column("issues_fts")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+# --- Setup ---
+def install(connection):
+    """Create the search column/index (PostgreSQL) or FTS table (SQLite) if missing.
+
+    New databases get these through models' after_create hooks; this is for
+    databases created before search existed.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in models.POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        for statement in models.SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO issues_fts(issues_fts) VALUES ('rebuild')"))
+
+
+# --- Query building ---
+def _fts5_query(q: str) -> str:
+    # Quote every word so user input cannot reach FTS5 query syntax; the
+    # words are ANDed, matching websearch_to_tsquery on PostgreSQL.
+    return " ".join(f'"{word}"' for word in _WORD.findall(q))
+
+
+def _matching(db: Session, q: str):
+    """Return (query over the IssueOut columns plus a score, score expression); higher ranks first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", q)
+        vector = literal_column("issues.search_vector")
+        # float8 so the score round-trips through the cursor exactly.
+        score = cast(func.ts_rank_cd(vector, tsquery), Float(precision=53))
+        query = db.query(*serialization.ISSUE_OUT_COLUMNS, score).filter(vector.op("@@")(tsquery))
+        return query, score
+    if dialect == "sqlite":
+        match = _fts5_query(q)
+        if not match:
+            raise HTTPException(status_code=400, detail="Search query has no words")
+        score = -func.bm25(_fts_match)
+        query = (
+            db.query(*serialization.ISSUE_OUT_COLUMNS, score)
+            .join(_fts, _fts.c.rowid == models.Issue.id)
+            .filter(_fts_match.op("MATCH")(match))
+        )
+        return query, score
+    raise HTTPException(status_code=501, detail="Search is not available on this database")
+
+
+def search_page(db: Session, q: str, limit: int, cursor: Optional[str] = None,
+                status=None, severity=None, reporter_id: Optional[int] = None, include_archived: bool = False):
+    """Return (IssueOut-shaped dicts, next_cursor), ranked by relevance then id, keyset paginated."""
+    query, score = _matching(db, q)
+    query = partitions.hot_only(pagination.apply_filters(query, status, severity, reporter_id), include_archived)
+
+    if cursor:
+        position = pagination.decode_position(cursor)
+        try:
+            last = (float(position["r"]), int(position["i"]))
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(tuple_(score, models.Issue.id) < tuple_(*last))
+
+    rows = query.order_by(score.desc(), models.Issue.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = pagination.encode_position({"r": last[-1], "i": last.id})
+    return serialization.issue_rows(row[:-1] for row in rows), next_cursor
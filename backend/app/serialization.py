@@ -0,0 +1,35 @@
+import enum
+import json
+from datetime import date, datetime
+
+from app import models, schemas
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# The columns schemas.IssueOut exposes, in schema order. Selecting just
+# these returns plain rows: no ORM identity map, no reporter relationship.
+ISSUE_OUT_FIELDS = tuple(schemas.IssueOut.__annotations__)
+ISSUE_OUT_COLUMNS = tuple(getattr(models.Issue, name) for name in ISSUE_OUT_FIELDS)
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    """Encode plain dicts/lists (datetimes and enums allowed) to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode()
+
+
+def issue_rows(rows) -> list[dict]:
+    """Turn ISSUE_OUT_COLUMNS rows into IssueOut-shaped dicts without per-row validation."""
+    return [dict(zip(ISSUE_OUT_FIELDS, row)) for row in rows]
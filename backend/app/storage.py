@@ -0,0 +1,151 @@
+import hashlib
+import mimetypes
+import os
+import re
+import uuid
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+# --- Config ---
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+CHUNK_SIZE = 1024 * 1024
+# Allowance for the non-file form fields and multipart framing.
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+
+# --- Layout ---
+# Attachments are stored once per distinct content at
+# UPLOAD_DIR/<first two hex digits>/<sha256>. Issue.file_path keeps
+# "<sha256><ext>" so the download can still pick a content type.
+def _blob_path(digest: str) -> str:
+    return os.path.join(UPLOAD_DIR, digest[:2], digest)
+
+
+def resolve(file_path: str) -> tuple[str, Optional[str]]:
+    """Map an Issue.file_path to (path on disk, sha256 digest or None for legacy uploads)."""
+    name = os.path.basename(file_path)
+    digest = os.path.splitext(name)[0]
+    if _DIGEST.fullmatch(digest):
+        return _blob_path(digest), digest
+    # Uploads from before content addressing were stored flat under a uuid.
+    return os.path.join(UPLOAD_DIR, name), None
+
+
+def media_type(file_path: str) -> str:
+    return mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+
+
+# Raster images are shown in the browser; everything else (including SVG,
+# which can carry script) is downloaded.
+INLINE_MEDIA_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "image/bmp"}
+
+
+def disposition_type(media_type: str) -> str:
+    return "inline" if media_type in INLINE_MEDIA_TYPES else "attachment"
+
+
+# --- Upload ---
+def _commit_blob(tmp_path: str, digest: str):
+    final_path = _blob_path(digest)
+    if os.path.exists(final_path):
+        # Identical content is already stored; keep the existing copy.
+        os.remove(tmp_path)
+        return
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(tmp_path, final_path)
+
+
+async def save_upload(upload: UploadFile) -> str:
+    """Stream ``upload`` to disk in chunks, enforcing MAX_UPLOAD_BYTES, and return its file_path."""
+    ext = os.path.splitext(upload.filename or "")[1].lower()
+    tmp_path = os.path.join(UPLOAD_DIR, f".{uuid.uuid4()}.part")
+    hasher = hashlib.sha256()
+    size = 0
+
+    out = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Attachment too large")
+            hasher.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        out.close()
+        os.remove(tmp_path)
+        raise
+    out.close()
+
+    digest = hasher.hexdigest()
+    await run_in_threadpool(_commit_blob, tmp_path, digest)
+    return f"{digest}{ext}"
+
+
+# --- Request size guard ---
+class UploadLimitMiddleware:
+    """Cap multipart request bodies at the attachment limit before the form is parsed.
+
+    A declared Content-Length over the cap is refused up front; otherwise
+    the received bytes are counted as they stream in, so chunked bodies
+    are cut off before Starlette spools them to disk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.limit = MAX_UPLOAD_BYTES + FORM_OVERHEAD_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/"):
+            await self.app(scope, receive, send)
+            return
+
+        length = headers.get(b"content-length")
+        if length and length.isdigit() and int(length) > self.limit:
+            await self._reject(send)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    raise HTTPException(status_code=413, detail="Attachment too large")
+            return message
+
+        async def tracked_send(message):
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as exc:
+            # Normally the app's exception handler answers; this covers a
+            # read that happens outside it.
+            if exc.status_code != 413 or started:
+                raise
+            await self._reject(send)
+
+    @staticmethod
+    async def _reject(send):
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": b'{"detail":"Attachment too large"}'})
@@ -0,0 +1,117 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas, counters, history
+
+# Upper bound on explicit ids per request; filters have no such limit.
+MAX_BATCH_IDS = 10000
+
+
+def _where(selection: schemas.IssueSelection):
+    """Translate a selection into one WHERE clause over the issues table."""
+    issue = models.Issue.__table__.c
+    clauses = []
+    if selection.ids is not None:
+        if len(selection.ids) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per batch")
+        clauses.append(issue.id.in_(selection.ids))
+    if selection.status is not None:
+        clauses.append(issue.status == models.Status(selection.status.value))
+    if selection.severity is not None:
+        clauses.append(issue.severity == models.Severity(selection.severity.value))
+    if selection.reporter_id is not None:
+        clauses.append(issue.reporter_id == selection.reporter_id)
+    if selection.older_than_days is not None:
+        cutoff = datetime.utcnow() - timedelta(days=selection.older_than_days)
+        clauses.append(issue.created_at < cutoff)
+
+    # An empty selection would touch every issue; make that explicit.
+    if not clauses:
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
+    return and_(*clauses)
+
+
+def update_status(db: Session, selection: schemas.IssueSelection, new_status) -> dict:
+    """Move every selected issue to ``new_status`` in one UPDATE ... RETURNING."""
+    table = models.Issue.__table__
+    new_status = models.Status(new_status.value)
+
+    where = and_(_where(selection), table.c.status != new_status)
+    now = datetime.utcnow()
+    values = {"status": new_status, "updated_at": now}
+    if new_status != models.Status.DONE:
+        # Reopened issues move back to the hot partition.
+        values["archived"] = False
+
+    if db.get_bind().dialect.name == "postgresql":
+        # UPDATE ... FROM a locking subselect so RETURNING can report each
+        # row's previous status, which the counters and history need.
+        previous = (
+            select(table.c.id, table.c.status.label("old_status"))
+            .where(where)
+            .with_for_update()
+            .subquery()
+        )
+        stmt = (
+            update(table)
+            .where(table.c.id == previous.c.id)
+            .values(**values)
+            .returning(table.c.id, table.c.severity, previous.c.old_status, table.c.created_at)
+        )
+        rows = db.execute(stmt).all()
+    else:
+        # SQLite cannot return columns from UPDATE ... FROM tables; read the
+        # affected rows first, then update the same set.
+        rows = db.execute(
+            select(table.c.id, table.c.severity, table.c.status, table.c.created_at).where(where)
+        ).all()
+        db.execute(update(table).where(where).values(**values))
+
+    moved = Counter((severity, old_status) for _, severity, old_status, _ in rows)
+    history.record(db, (
+        history.transition(issue_id, severity, old_status, new_status, created_at=created_at, at=now)
+        for issue_id, severity, old_status, created_at in rows
+    ))
+
+    deltas = Counter()
+    for (severity, old_status), count in moved.items():
+        deltas[(severity, old_status)] -= count
+        deltas[(severity, new_status)] += count
+    # Fixed bucket order, as in counters.record_status_change.
+    for (severity, status), delta in sorted(deltas.items(), key=lambda item: (item[0][0].value, item[0][1].value)):
+        counters.bump(db, severity, status, delta)
+    db.commit()
+
+    return {
+        "updated": sum(moved.values()),
+        "new_status": new_status,
+        "changes": [
+            {"severity": severity, "from_status": old_status, "count": count}
+            for (severity, old_status), count in sorted(moved.items(), key=str)
+        ],
+    }
+
+
+def delete_issues(db: Session, selection: schemas.IssueSelection) -> dict:
+    """Delete every selected issue in one DELETE ... RETURNING."""
+    table = models.Issue.__table__
+    stmt = delete(table).where(_where(selection)).returning(table.c.id, table.c.severity, table.c.status)
+    rows = db.execute(stmt).all()
+    removed = Counter((severity, status) for _, severity, status in rows)
+    history.record(db, (history.transition(issue_id, severity, status, None) for issue_id, severity, status in rows))
+
+    for (severity, status), count in removed.items():
+        counters.bump(db, severity, status, -count)
+    db.commit()
+
+    return {
+        "deleted": sum(removed.values()),
+        "changes": [
+            {"severity": severity, "status": status, "count": count}
+            for (severity, status), count in sorted(removed.items(), key=str)
+        ],
+    }
@@ -0,0 +1,31 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from app import models
+
+# Columns added to tables after they first shipped. create_all never alters
+# an existing table, so install() adds the missing ones; each is nullable or
+# has a server default that fills the rows already there.
+ADDED_COLUMNS = {
+    "users": ["token_version"],
+    "issues": ["updated_at", "idempotency_key", "archived"],
+}
+
+
+def install(connection):
+    """Add missing columns and model indexes to tables created by an older schema."""
+    inspector = inspect(connection)
+    for table_name, names in ADDED_COLUMNS.items():
+        table = models.Base.metadata.tables[table_name]
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        added = [name for name in names if name not in existing]
+        for name in added:
+            # The same column spec CREATE TABLE would use (type, default, NOT NULL).
+            spec = CreateColumn(table.c[name]).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {spec}"))
+        if "updated_at" in added:
+            # Export watermarks and archival read updated_at; creation is the best estimate.
+            connection.execute(text(f"UPDATE {table_name} SET updated_at = created_at WHERE updated_at IS NULL"))
+        # Indexes are likewise only created along with their table.
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
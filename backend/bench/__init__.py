@@ -0,0 +1,15 @@
+"""Offline load tests and benchmarks for the API.
+
+    python -m bench.seed --issues 1000000
+    python -m bench.run --mode inprocess --out results.json --baseline baseline.json
+
+Both read DATABASE_URL (or --database-url) the same way the app does, so
+point them at a throwaway SQLite file or a local Postgres.
+"""
+import os
+
+
+def configure(database_url=None):
+    """Point app.database at ``database_url``; must run before any ``app`` import."""
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
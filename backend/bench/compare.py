@@ -0,0 +1,64 @@
+import json
+import sys
+from pathlib import Path
+
+# (label, getter, True if bigger is better)
+METRICS = (
+    ("p50 ms", lambda r: r["latency_ms"]["p50"], False),
+    ("p95 ms", lambda r: r["latency_ms"]["p95"], False),
+    ("p99 ms", lambda r: r["latency_ms"]["p99"], False),
+    ("req/s", lambda r: r["throughput_rps"], True),
+    ("queries", lambda r: r["queries_per_request"], False),
+)
+
+
+def _format(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(report: dict):
+    for mode, endpoints in report["results"].items():
+        print(f"\n{mode}")
+        print(f"  {'endpoint':<16}" + "".join(f"{label:>10}" for label, _, _ in METRICS) + f"{'errors':>8}")
+        for name, result in endpoints.items():
+            values = "".join(f"{_format(get(result)):>10}" for _, get, _ in METRICS)
+            print(f"  {name:<16}{values}{result['errors']:>8}")
+
+
+def _same_dataset(old: dict, new: dict) -> bool:
+    # create_issue runs grow the table a little, so allow some drift.
+    if (old["dialect"], old["reporters"]) != (new["dialect"], new["reporters"]):
+        return False
+    return abs(new["issues"] - old["issues"]) <= 0.05 * max(old["issues"], 1)
+
+
+def compare(baseline: dict, current: dict):
+    """Print each metric's change from ``baseline`` to ``current``; "!" marks a regression."""
+    print(f"\nvs baseline {baseline['meta'].get('git_revision')} ({baseline['meta']['started_at']})")
+    if not _same_dataset(baseline["meta"]["dataset"], current["meta"]["dataset"]):
+        print("  note: datasets differ, so numbers are not directly comparable")
+    if baseline["meta"]["settings"] != current["meta"]["settings"]:
+        print("  note: run settings differ (concurrency, duration, workers, ...)")
+    for mode, endpoints in current["results"].items():
+        for name, result in endpoints.items():
+            before = baseline["results"].get(mode, {}).get(name)
+            if before is None:
+                continue
+            changes = []
+            for label, get, bigger_is_better in METRICS:
+                old, new = get(before), get(result)
+                if not old or new is None:
+                    continue
+                change = 100 * (new - old) / old
+                worse = change < 0 if bigger_is_better else change > 0
+                changes.append(f"{label} {change:+.1f}%{'!' if worse and abs(change) >= 5 else ''}")
+            print(f"  {mode:<10} {name:<16} " + "  ".join(changes))
+
+
+if __name__ == "__main__":
+    # python -m bench.compare baseline.json current.json
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m bench.compare BASELINE.json CURRENT.json")
+    baseline, current = (json.loads(Path(path).read_text()) for path in sys.argv[1:])
+    print_report(current)
+    compare(baseline, current)
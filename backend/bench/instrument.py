@@ -0,0 +1,34 @@
+from app import metrics
+
+QUERY_COUNT_HEADER = "X-Bench-Queries"
+
+
+class QueryCountMiddleware:
+    """Report the SQL statements a request ran in the X-Bench-Queries response header.
+
+    The count is app.metrics' per-request tally; the response start is sent
+    from inside MetricsMiddleware, so the request's stats are still current.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_with_count(message):
+            stats = metrics.current_stats()
+            if message["type"] == "http.response.start" and stats is not None:
+                headers = list(message.get("headers", []))
+                headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.queries).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_count)
+
+
+def instrumented_app():
+    from main import app
+
+    return QueryCountMiddleware(app)
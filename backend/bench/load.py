@@ -0,0 +1,133 @@
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import httpx
+
+from bench.instrument import QUERY_COUNT_HEADER
+from bench.seed import BENCH_PASSWORD, SEVERITY_WEIGHTS, WORDS, user_email
+
+
+# --- Scenarios ---
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    # Role whose bearer token is sent, or None for anonymous requests.
+    role: Optional[str]
+    # Builds the keyword arguments for one httpx request.
+    build: Callable[[random.Random, dict], dict]
+
+
+def _list_issues(rng: random.Random, ctx: dict) -> dict:
+    params = {"limit": rng.choice((20, 50, 100))}
+    filter_kind = rng.random()
+    if filter_kind < 0.3:
+        params["status"] = rng.choice(("OPEN", "TRIAGED", "IN_PROGRESS"))
+    elif filter_kind < 0.5:
+        params["severity"] = rng.choice(tuple(SEVERITY_WEIGHTS))
+    return {"method": "GET", "url": "/issues/", "params": params}
+
+
+def _severity_counts(rng: random.Random, ctx: dict) -> dict:
+    return {"method": "GET", "url": "/insights/severity-counts"}
+
+
+def _login(rng: random.Random, ctx: dict) -> dict:
+    email = user_email("REPORTER", rng.randrange(ctx["reporters"]))
+    return {"method": "POST", "url": "/login", "data": {"username": email, "password": BENCH_PASSWORD}}
+
+
+def _create_issue(rng: random.Random, ctx: dict) -> dict:
+    data = {
+        "title": " ".join(rng.choices(WORDS, k=5)),
+        "description": " ".join(rng.choices(WORDS, k=20)),
+        "severity": rng.choice(tuple(SEVERITY_WEIGHTS)),
+    }
+    return {"method": "POST", "url": "/issues/", "data": data}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("list_issues", "MAINTAINER", _list_issues),
+        Scenario("severity_counts", None, _severity_counts),
+        Scenario("login", None, _login),
+        Scenario("create_issue", "REPORTER", _create_issue),
+    )
+}
+
+
+# --- Driving load ---
+async def login_tokens(client: httpx.AsyncClient) -> dict:
+    tokens = {}
+    for role in ("ADMIN", "MAINTAINER", "REPORTER"):
+        response = await client.post("/login", data={"username": user_email(role, 0), "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        tokens[role] = response.json()["access_token"]
+    return tokens
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(latency for latency, status, _ in samples if status < 400)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    queries = [count for _, _, count in samples if count is not None]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(latencies),
+        "status_counts": statuses,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": 1000 * percentile(latencies, 0.50),
+            "p95": 1000 * percentile(latencies, 0.95),
+            "p99": 1000 * percentile(latencies, 0.99),
+            "mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "max": 1000 * latencies[-1] if latencies else 0.0,
+        },
+        "queries_per_request": sum(queries) / len(queries) if queries else None,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: dict,
+                       concurrency: int, duration: float, warmup: int, seed: int) -> dict:
+    """Hit one endpoint from ``concurrency`` clients for ``duration`` seconds."""
+    headers = {}
+    if scenario.role:
+        headers["Authorization"] = f"Bearer {ctx['tokens'][scenario.role]}"
+
+    async def send(rng: random.Random):
+        request = scenario.build(rng, ctx)
+        started = time.perf_counter()
+        response = await client.request(headers=headers, **request)
+        latency = time.perf_counter() - started
+        count = response.headers.get(QUERY_COUNT_HEADER)
+        return latency, response.status_code, int(count) if count is not None else None
+
+    warm_rng = random.Random(seed - 1)
+    for _ in range(warmup):
+        await send(warm_rng)
+
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int):
+        # Each client gets its own stream so runs are reproducible.
+        rng = random.Random(seed * 1000 + n)
+        while time.perf_counter() < deadline:
+            samples.append(await send(rng))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started)
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench import configure
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SERVER_START_TIMEOUT = 60
+
+
+# --- Targets ---
+@asynccontextmanager
+async def inprocess_client():
+    """An httpx client calling the ASGI app directly, lifespan included."""
+    import httpx
+
+    from bench.instrument import instrumented_app
+    from main import app
+
+    wrapped = instrumented_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=wrapped)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int):
+    """Start `uvicorn bench.server:app` on a free local port and yield a client for it."""
+    import httpx
+
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "bench.server:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+    base_url = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            deadline = time.monotonic() + SERVER_START_TIMEOUT
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start in time")
+                    await asyncio.sleep(0.2)
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+# --- Metadata ---
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dataset() -> dict:
+    from sqlalchemy import func
+
+    from app import models
+    from app.database import SessionLocal, engine
+
+    with SessionLocal() as db:
+        return {
+            "dialect": engine.dialect.name,
+            "issues": db.query(func.count(models.Issue.id)).scalar(),
+            "users": db.query(func.count(models.User.id)).scalar(),
+            "reporters": db.query(func.count(models.User.id))
+            .filter(models.User.email.like("bench-reporter-%"))
+            .scalar(),
+        }
+
+
+# --- Running ---
+async def run_mode(mode: str, args, dataset: dict) -> dict:
+    from bench.load import SCENARIOS, login_tokens, run_scenario
+
+    client_context = inprocess_client() if mode == "inprocess" else uvicorn_client(args.workers)
+    results = {}
+    async with client_context as client:
+        ctx = {"tokens": await login_tokens(client), "reporters": dataset["reporters"]}
+        for name in args.endpoints:
+            print(f"[{mode}] {name}: {args.concurrency} clients for {args.duration:g}s ...", flush=True)
+            results[name] = await run_scenario(
+                client, SCENARIOS[name], ctx,
+                concurrency=args.concurrency, duration=args.duration,
+                warmup=args.warmup, seed=args.seed,
+            )
+    return results
+
+
+def main(argv=None):
+    from bench.load import SCENARIOS
+
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints against a seeded database.")
+    parser.add_argument("--database-url", help="defaults to $DATABASE_URL")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn", "both"), default="inprocess")
+    parser.add_argument("--endpoints", nargs="+", choices=tuple(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="requests per endpoint before measuring")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--response-cache", action="store_true",
+                        help="keep the rendered-response cache on (off by default so repeated reads hit the database)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against an earlier results JSON")
+    args = parser.parse_args(argv)
+
+    configure(args.database_url)
+    if not args.response_cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    dataset = _dataset()
+    if not dataset["reporters"]:
+        parser.error("no bench users found; run `python -m bench.seed` first")
+
+    modes = ("inprocess", "uvicorn") if args.mode == "both" else (args.mode,)
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": dataset,
+            "settings": {
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "warmup": args.warmup,
+                "workers": args.workers,
+                "seed": args.seed,
+                "response_cache": args.response_cache,
+            },
+        },
+        "results": {mode: asyncio.run(run_mode(mode, args, dataset)) for mode in modes},
+    }
+
+    from bench.compare import compare, print_report
+
+    print_report(report)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"✅ Results written to {args.out}")
+    if args.baseline:
+        compare(json.loads(Path(args.baseline).read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bench import configure
+
+BENCH_PASSWORD = "bench-password"
+
+# Rough shape of a real tracker: mostly low/medium issues, most of them
+# closed, with the open backlog concentrated in recent weeks.
+SEVERITY_WEIGHTS = {"LOW": 0.55, "MEDIUM": 0.33, "HIGH": 0.12}
+STATUS_WEIGHTS = {"DONE": 0.62, "OPEN": 0.18, "TRIAGED": 0.11, "IN_PROGRESS": 0.09}
+
+WORDS = (
+    "login crash timeout export dashboard upload slow error page button "
+    "search filter chart token session mobile safari api webhook email "
+    "billing invoice report permission attachment sync offline cache"
+).split()
+
+SEED_BATCH_SIZE = 10000
+
+
+def user_email(role: str, n: int) -> str:
+    return f"bench-{role.lower()}-{n}@example.com"
+
+
+def _users(args) -> list[dict]:
+    from app import auth
+
+    # One bcrypt hash shared by every seeded account keeps seeding fast.
+    hashed = auth.hash_password(BENCH_PASSWORD)
+    counts = {"ADMIN": args.admins, "MAINTAINER": args.maintainers, "REPORTER": args.reporters}
+    return [
+        {"email": user_email(role, n), "hashed_password": hashed, "role": role}
+        for role, count in counts.items()
+        for n in range(count)
+    ]
+
+
+def _issue_rows(rng: random.Random, count: int, reporter_ids: list[int], days: int):
+    severities, severity_weights = zip(*SEVERITY_WEIGHTS.items())
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    now = datetime.utcnow()
+    # A few reporters file most issues.
+    reporter_weights = [1 / (rank + 1) for rank in range(len(reporter_ids))]
+    for n in range(count):
+        # Skew towards recent dates: issue volume grows over time.
+        created_at = now - timedelta(seconds=days * 86400 * rng.random() ** 2)
+        status = rng.choices(statuses, status_weights)[0]
+        if status != "DONE" and rng.random() < 0.5:
+            # Open work is mostly recent.
+            created_at = now - timedelta(seconds=14 * 86400 * rng.random())
+        title = " ".join(rng.choices(WORDS, k=rng.randint(3, 7)))
+        yield {
+            "title": title,
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(10, 40))),
+            "severity": rng.choices(severities, severity_weights)[0],
+            "status": status,
+            "reporter_id": rng.choices(reporter_ids, reporter_weights)[0],
+            "created_at": created_at,
+            "updated_at": created_at + timedelta(hours=rng.randint(0, 72)) if status != "OPEN" else created_at,
+        }
+
+
+def seed(args):
+    from sqlalchemy import insert, select
+
+    from app import counters, history, models, partitions, search, upgrade
+    from app.database import SessionLocal, engine
+
+    if args.reset:
+        models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        upgrade.install(connection)
+        # Monthly partitions (PostgreSQL) must exist for the whole seeded range.
+        partitions.install(connection, since=datetime.utcnow() - timedelta(days=args.days))
+        search.install(connection)
+
+    with engine.begin() as connection:
+        connection.execute(insert(models.User.__table__), _users(args))
+        reporter_ids = connection.execute(
+            select(models.User.id).where(models.User.email.like("bench-reporter-%")).order_by(models.User.id)
+        ).scalars().all()
+
+    statement = insert(models.Issue.__table__)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    batch = []
+    inserted = 0
+    for row in _issue_rows(rng, args.issues, reporter_ids, args.days):
+        batch.append(row)
+        if len(batch) == SEED_BATCH_SIZE:
+            inserted += _insert_batch(engine, statement, batch)
+            batch = []
+            print(f"  {inserted:,} issues ({inserted / (time.perf_counter() - started):,.0f}/s)", end="\r")
+    inserted += _insert_batch(engine, statement, batch)
+
+    with SessionLocal() as db:
+        counters.rebuild(db)
+        history.backfill(db)
+        history.rebuild(db)
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("VACUUM ANALYZE")
+    print(f"\n✅ Seeded {len(reporter_ids)} reporters and {inserted:,} issues in {time.perf_counter() - started:.1f}s.")
+
+
+def _insert_batch(engine, statement, batch: list[dict]) -> int:
+    if not batch:
+        return 0
+    with engine.begin() as connection:
+        connection.execute(statement, batch)
+    return len(batch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a database with a synthetic issue tracker dataset.")
+    parser.add_argument("--database-url", help="defaults to $DATABASE_URL")
+    parser.add_argument("--issues", type=int, default=100000)
+    parser.add_argument("--reporters", type=int, default=200)
+    parser.add_argument("--maintainers", type=int, default=10)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--days", type=int, default=730, help="spread created_at over this many days")
+    parser.add_argument("--seed", type=int, default=1, help="random seed, for reproducible datasets")
+    parser.add_argument("--reset", action="store_true", help="drop all tables first")
+    args = parser.parse_args(argv)
+
+    configure(args.database_url)
+    seed(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+# Entry point for `uvicorn bench.server:app`: the real app plus query counting.
+from bench.instrument import instrumented_app
+
+app = instrumented_app()
@@ -1,17 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.routes import router as app_router
 from app import auth  # ✅ import auth to include login route
+from app import pagination, realtime, hashing, google, storage, metrics, database, partitions
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    realtime.start(asyncio.get_running_loop())
+    database.replicas.start()
+    partitions.start()
+    yield
+    partitions.stop()
+    realtime.stop()
+    await database.replicas.stop()
+    hashing.shutdown()
+    await google.aclose()
+
+
+app = FastAPI(title="Issues & Insights Tracker API", lifespan=lifespan)
+
+# Compress large list/export bodies for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Refuse oversized attachment uploads before the multipart body is parsed
+app.add_middleware(storage.UploadLimitMiddleware)
 
-app = FastAPI(title="Issues & Insights Tracker API")
+# Per-route latency and SQL statement counts, exported on /metrics
+app.add_middleware(metrics.MetricsMiddleware)
 
-# ✅ CORS setup
+# ✅ CORS setup (added last so it also wraps early rejections)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],  # Frontend origin (adjust if needed)
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # ✅ API routes
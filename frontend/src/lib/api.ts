@@ -1,10 +1,26 @@
 // src/lib/api.ts
-export async function fetchIssues() {
-	const res = await fetch('http://localhost:8000/issues/', {
+const API_URL = 'http://localhost:8000';
+
+export type IssuePage<T> = {
+	issues: T[];
+	// Pass back as `cursor` for the next page; null on the last page.
+	nextCursor: string | null;
+};
+
+// One page of GET /issues/ (newest first unless `sort` says otherwise).
+export async function fetchIssues<T>(
+	token: string,
+	{ sort = '-created_at', cursor = null as string | null } = {}
+): Promise<IssuePage<T>> {
+	const params = new URLSearchParams({ sort });
+	if (cursor) params.set('cursor', cursor);
+	const res = await fetch(`${API_URL}/issues/?${params}`, {
+		// Sends the recent_write cookie so reads right after a write skip replicas.
+		credentials: 'include',
 		headers: {
-			Authorization: 'Bearer YOUR_TOKEN_HERE'  // we'll skip auth for now or disable auth temporarily
+			Authorization: `Bearer ${token}`
 		}
 	});
 	if (!res.ok) throw new Error('Failed to fetch issues');
-	return res.json();
+	return { issues: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
 }